@@ -0,0 +1,59 @@
+"""
+Compare requests/sec of a new session per request against the pooled session
+of `HackerNewsClient`, using a local keep-alive stub server.
+
+Usage:
+    python -m benchmarks.bench_session_pool --requests 500
+"""
+import argparse
+import time
+
+from config import settings
+from core.api.clients.hackernews_client import HackerNewsClient
+from core.api.stub_server import HackerNewsStubServer, StubItemGraph
+
+
+class _SessionPerRequestClient(HackerNewsClient):
+    """Baseline: a new session per request, as BaseClient did before pooling"""
+
+    @property
+    def transport(self):
+        self.close()
+        self._transport = self._create_transport()
+        return self._transport
+
+
+def _session_per_request(url, total):
+    with _SessionPerRequestClient(url) as client:
+        for _ in range(total):
+            client.get_item(1)
+
+
+def _pooled_client(url, total):
+    with HackerNewsClient(url) as client:
+        for _ in range(total):
+            client.get_item(1)
+
+
+def _requests_per_sec(func, url, total):
+    start = time.perf_counter()
+    func(url, total)
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    settings.set("detailed_logs", False)  # measure transport, not tracing
+    with HackerNewsStubServer(StubItemGraph(stories=1, max_kids=0)) as server:
+        before = _requests_per_sec(_session_per_request, server.url, args.requests)
+        after = _requests_per_sec(_pooled_client, server.url, args.requests)
+
+    print(f"session per request: {before:8.1f} req/s")
+    print(f"pooled session:      {after:8.1f} req/s ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
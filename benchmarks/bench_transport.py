@@ -0,0 +1,79 @@
+"""
+Compare batch throughput of the HTTP/1.1 pool (`http1` transport) against
+HTTP/2 multiplexing (`http2` transport) on local stub servers.
+
+Each stub runs in its own process so the server does not compete with the
+client for the GIL; `--latency` stands in for the network round trip.
+
+Usage:
+    python -m benchmarks.bench_transport --items 2000 --concurrency 50 --latency 0.02
+"""
+import argparse
+import socket
+import subprocess
+import sys
+import time
+
+from config import ROOT_DIR, settings
+from core.api.clients.hackernews_client import HackerNewsClient
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_stub(http2, latency, stories):
+    port = _free_port()
+    command = [sys.executable, "-m", "core.api.stub_server", "--port", str(port),
+               "--stories", str(stories), "--latency", str(latency), "--http2" if http2 else "--no-http2"]
+    process = subprocess.Popen(command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL)
+    for _ in range(100):  # wait until it accepts connections
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Stub server did not start")
+
+
+def _items_per_sec(url, transport, items, concurrency):
+    with HackerNewsClient(url, transport=transport, pool_maxsize=concurrency) as client:
+        client.get_items(range(1, concurrency + 1), max_concurrency=concurrency)  # warm up connections
+        start = time.perf_counter()
+        results = client.get_items(range(1, items + 1), max_concurrency=concurrency)
+        elapsed = time.perf_counter() - start
+    failed = sum(not result.ok for result in results)
+    return items / elapsed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    # measure the transports, not tracing, client-side throttling or coalescing
+    settings.set("detailed_logs", False)
+    settings.set("rate_limit.enabled", False)
+    settings.set("coalesce_requests", False)
+
+    results = {}
+    for transport, http2 in (("http1", False), ("http2", True)):
+        process, url = _start_stub(http2, args.latency, args.items)
+        try:
+            results[transport] = _items_per_sec(url, transport, args.items, args.concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+
+    http1, http2 = results["http1"][0], results["http2"][0]
+    print(f"http1 pool ({args.concurrency} connections): {http1:8.1f} items/s, {results['http1'][1]} failed")
+    print(f"http2 (1 connection):      {http2:8.1f} items/s, {results['http2'][1]} failed ({http2 / http1:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import pytest
+
+from benchmarks.harness import BenchmarkRecorder
+from config import settings
+
+pytest_plugins = ["fixtures.hn_stub"]
+
+recorder_key = pytest.StashKey[BenchmarkRecorder]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark-save-baseline",
+        action="store_true",
+        help="Store this run's results as the benchmark baseline",
+    )
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Warn loudly when benchmarks ran without a baseline to compare against"""
+    recorder = config.stash.get(recorder_key, None)
+    if recorder is None or not recorder.unchecked or config.getoption("--benchmark-save-baseline"):
+        return
+    terminalreporter.write_sep("!", "benchmark regressions NOT checked", red=True, bold=True)
+    if not recorder.baseline:
+        terminalreporter.write_line(f"No baseline at {recorder.baseline_path}")
+    terminalreporter.write_line(f"Benchmarks without a baseline: {', '.join(recorder.unchecked)}")
+    terminalreporter.write_line("Store one with `make benchmark-baseline` on this machine")
+
+
+@pytest.fixture(scope="session")
+def bench(request):
+    """Benchmark recorder, results are written to `benchmark.results` at session end"""
+    recorder = BenchmarkRecorder()
+    request.config.stash[recorder_key] = recorder
+    yield recorder
+    recorder.save(settings.benchmark.results)
+    if request.config.getoption("--benchmark-save-baseline"):
+        recorder.save(recorder.baseline_path)
+
+
+@pytest.fixture
+def benchmark(bench):
+    """Measure a callable and fail the test if it regressed against the baseline"""
+    def measure(name, func, **kwargs):
+        summary = bench.measure(name, func, **kwargs)
+        regression = bench.regression(name)
+        assert regression is None, regression
+        return summary
+    return measure
+
+
+@pytest.fixture
+def detailed_logs():
+    """Set `detailed_logs` for the test and restore it afterwards"""
+    original = settings.detailed_logs
+
+    def set_detailed_logs(enabled):
+        settings.set("detailed_logs", enabled)
+
+    yield set_detailed_logs
+    settings.set("detailed_logs", original)
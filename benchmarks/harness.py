@@ -0,0 +1,96 @@
+import json
+import os
+import time
+
+from config import ROOT_DIR, settings
+from core.api.metrics import percentile
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+
+def summarize(samples, ops=1):
+    """Summary of per-round durations in seconds, `ops` operations per round"""
+    ordered = sorted(samples)
+    mean = sum(ordered) / len(ordered)
+    return {
+        "rounds": len(ordered),
+        "ops_per_round": ops,
+        "mean": mean,
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "ops_per_sec": ops / mean if mean else None,
+    }
+
+
+class BenchmarkRecorder:
+    """
+    Times benchmark callables, keeps their summaries and compares them with a
+    stored baseline.
+
+    A benchmark regresses when its p50 exceeds the baseline p50 by more than
+    `regression_threshold` (a ratio, e.g. 1.5 = 50% slower). Benchmarks
+    without a baseline entry are not checked and are listed in `unchecked`.
+    """
+
+    def __init__(self, baseline_path=None, threshold=None):
+        self.results = {}
+        self.threshold = threshold or settings.benchmark.regression_threshold
+        self.baseline_path = _abs_path(baseline_path or settings.benchmark.baseline)
+        self.baseline = {}
+        self.unchecked = []  # benchmarks measured without a baseline to compare with
+        if os.path.exists(self.baseline_path):
+            with open(self.baseline_path) as f:
+                self.baseline = json.load(f)["benchmarks"]
+
+    def measure(self, name, func, rounds=None, warmup=1, ops=1):
+        """Run `func` `rounds` times after `warmup` calls and record the timings"""
+        rounds = rounds or settings.benchmark.rounds
+        for _ in range(warmup):
+            func()
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        summary = summarize(samples, ops)
+        self.results[name] = summary
+        logger.info(
+            f"Benchmark {name}: p50={summary['p50'] * 1000:.3f}ms "
+            f"p95={summary['p95'] * 1000:.3f}ms p99={summary['p99'] * 1000:.3f}ms"
+        )
+        return summary
+
+    def regression(self, name):
+        """Error message if `name` regressed against the baseline, else None"""
+        baseline = self.baseline.get(name)
+        if baseline is None:
+            self.unchecked.append(name)
+            logger.warning(f"Benchmark {name} has no baseline in {self.baseline_path}, regression not checked")
+            return None
+        current = self.results[name]["p50"]
+        if current > baseline["p50"] * self.threshold:
+            return (
+                f"Benchmark {name} regressed: p50 {current * 1000:.3f}ms vs "
+                f"baseline {baseline['p50'] * 1000:.3f}ms (threshold x{self.threshold})"
+            )
+        return None
+
+    def save(self, path):
+        path = _abs_path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(
+                {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "benchmarks": self.results},
+                f,
+                indent=4,
+                sort_keys=True,
+            )
+        logger.info(f"Saved {len(self.results)} benchmark results to {path}")
+
+
+def _abs_path(path):
+    return path if os.path.isabs(path) else os.path.join(ROOT_DIR, path)
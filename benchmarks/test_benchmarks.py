@@ -0,0 +1,105 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from config import ROOT_DIR
+from core.api.helpers.hacker_news_helpers import (
+    assert_item_top_story_response,
+    assert_item_comment_response,
+    get_first_story_comments,
+    top_stories
+)
+from core.api.helpers.item_schema import validate_items
+
+
+@pytest.fixture(scope="module")
+def stub_items(hn_stub_server):
+    """All stub items decoded, split into stories and comments"""
+    items = [json.loads(body) for body in hn_stub_server.graph.items.values()]
+    stories = [item for item in items if item['type'] == 'story']
+    comments = [item for item in items if item['type'] == 'comment']
+    return stories, comments
+
+
+@pytest.mark.benchmark
+class TestClientBenchmarks:
+    def test_single_item_latency(self, benchmark, hn_stub_client):
+        benchmark("single_item_latency", lambda: hn_stub_client.get_item(item_id=1), rounds=200)
+
+    def test_batch_throughput(self, benchmark, hn_stub_client):
+        all_top_stories = top_stories(hn_stub_client)
+        benchmark(
+            "batch_throughput",
+            lambda: hn_stub_client.get_items(all_top_stories),
+            rounds=5,
+            ops=len(all_top_stories),
+        )
+
+    def test_top_stories_first_with_comments(self, benchmark, hn_stub_client):
+        benchmark(
+            "top_stories_first_with_comments",
+            lambda: get_first_story_comments(client=hn_stub_client, item_ids=top_stories(hn_stub_client)),
+            rounds=20,
+        )
+
+    @pytest.mark.parametrize("enabled", [True, False], ids=["detailed_logs_on", "detailed_logs_off"])
+    def test_logging_overhead(self, benchmark, hn_stub_client, detailed_logs, enabled):
+        detailed_logs(enabled)
+        benchmark(
+            f"get_item_{'detailed_logs_on' if enabled else 'detailed_logs_off'}",
+            lambda: hn_stub_client.get_item(item_id=1),
+            rounds=200,
+        )
+
+
+@pytest.mark.benchmark
+class TestDecodeAndValidationBenchmarks:
+    def test_json_decode_top_stories(self, benchmark, hn_stub_client):
+        response = hn_stub_client.get_top_stories()
+        benchmark("json_decode_top_stories", response.json, rounds=500)
+
+    def test_json_decode_items(self, benchmark, hn_stub_client):
+        responses = [result.response for result in hn_stub_client.get_items(range(1, 101))]
+        benchmark(
+            "json_decode_items",
+            lambda: [response.json() for response in responses],
+            rounds=50,
+            ops=len(responses),
+        )
+
+    def test_assert_item_top_story_response(self, benchmark, stub_items):
+        stories, _ = stub_items
+        benchmark(
+            "assert_item_top_story_response",
+            lambda: [assert_item_top_story_response(story) for story in stories],
+            rounds=20,
+            ops=len(stories),
+        )
+
+    def test_assert_item_comment_response(self, benchmark, stub_items):
+        _, comments = stub_items
+        benchmark(
+            "assert_item_comment_response",
+            lambda: [assert_item_comment_response(comment) for comment in comments],
+            rounds=20,
+            ops=len(comments),
+        )
+
+    def test_validate_items_batch(self, benchmark, stub_items):
+        stories, comments = stub_items
+        items = stories + comments
+        benchmark("validate_items_batch", lambda: validate_items(items), rounds=20, ops=len(items))
+
+
+@pytest.mark.benchmark
+class TestStartupBenchmarks:
+    @pytest.mark.parametrize("module", ["config", "core.logconfig", "core.api.clients.hackernews_client"])
+    def test_import_time(self, benchmark, module):
+        command = [sys.executable, "-c", f"import {module}"]
+        benchmark(
+            f"import_{module.rsplit('.', 1)[-1]}",
+            lambda: subprocess.run(command, cwd=ROOT_DIR, check=True),
+            rounds=10,
+        )
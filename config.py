@@ -1,14 +1,40 @@
 import os
 import pathlib
-
-from dynaconf import Dynaconf
+import threading
 
 ROOT_DIR = pathlib.Path(os.path.dirname(os.path.abspath(__file__)))
 
-settings = Dynaconf(
-    load_dotenv=True,
-    envvar_prefix=False,
-    environments=True,
-    env="default",  # override via ENV_FOR_DYNACONF env variable
-    settings_files=["settings.yaml"],
-)
+
+class LazySettings:
+    """Dynaconf settings, imported and built on first attribute access
+
+    Importing `config` stays cheap for code that never reads a setting; the
+    first access loads `.env` and `settings.yaml` as before.
+    """
+
+    def __init__(self):
+        self._settings = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._settings is None:
+                from dynaconf import Dynaconf
+
+                self._settings = Dynaconf(
+                    load_dotenv=True,
+                    envvar_prefix=False,
+                    environments=True,
+                    env="default",  # override via ENV_FOR_DYNACONF env variable (record, replay)
+                    settings_files=["settings.yaml"],
+                )
+        return self._settings
+
+    def __getattr__(self, name):
+        settings = self._settings
+        if settings is None:
+            settings = self._load()
+        return getattr(settings, name)
+
+
+settings = LazySettings()
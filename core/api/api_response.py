@@ -1,33 +1,72 @@
 import json as j
+import time
+from typing import List
+
+from core.api.items import Item
 
 class ApiResponse:
     """API response wrapper"""
 
-    def __init__(self, response, response_time=None):
+    def __init__(self, response, response_time=None, on_decode=None):
+        """`on_decode` is called with the duration of every JSON decode"""
         self.response = response
         self.response_time = response_time
+        self.on_decode = on_decode
 
     def status_code(self):
-        return self.response.status_code
+        return self.response.status_code if self.response is not None else self._status_code
 
     def headers(self):
-        return self.response.headers
+        return self.response.headers if self.response is not None else self._headers
+
+    def body(self) -> bytes:
+        return self.response.content if self.response is not None else self._content
 
     def content(self):
-        return self.response.text
+        if self.response is not None:
+            return self.response.text
+        return self._content.decode("utf-8", errors="replace")
 
     def json(self):
-        """Returns JSON as dict"""
+        """Returns JSON as dict, decoded straight from the response bytes.
+        Every call decodes a new object, also after `release()`, so callers
+        sharing a cached response never see each other's changes."""
+        content = self.body()
         try:
-            if self.response.text:
-                return self.response.json()
-            return ""
+            if not content:
+                return ""
+            if self.on_decode is None:
+                return j.loads(content)
+            start = time.perf_counter()
+            data = j.loads(content)
+            self.on_decode(time.perf_counter() - start)
+            return data
         except ValueError as e:
             raise ValueError(
                 f"Failed to parse JSON response: {e}\n"
-                f"Actual response: {self.response.text}"
+                f"Actual response: {self.content()}"
             ) from e
 
+    def release(self):
+        """
+        Drop the underlying response, see `response.stream` in settings.yaml.
+
+        Only the body bytes, status code and headers are kept; the text,
+        connection and the rest of the response are freed with it.
+        """
+        response = self.response
+        if response is None:
+            return self
+        self._status_code = response.status_code
+        self._headers = response.headers
+        self._content = response.content
+        self.response = None  # bodies are read in full, the connection is already released
+        return self
+
+    def item(self):
+        """Returns the JSON body as a compact `Item` record, None for `null`"""
+        return Item.from_dict(self.json())
+
     def raise_error(self, message):
         try:
             body = f"\n{j.dumps(j.loads(self.content()), indent=4, sort_keys=True)}"
@@ -37,3 +76,61 @@ class ApiResponse:
             f"{message}\n"
             f"Response body: {body[:200]}...\n...\n(response body is truncated)"
         )
+
+
+class ItemResult:
+    """Outcome of a single fetch in a batch, holds either a response or an error"""
+
+    def __init__(self, item_id, response: ApiResponse = None, error: Exception = None):
+        self.item_id = item_id
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def json(self):
+        """Returns JSON as dict, re-raises the fetch error if the item failed"""
+        if self.error is not None:
+            raise self.error
+        return self.response.json()
+
+    def item(self):
+        """Returns the item as a compact `Item` record, re-raises the fetch error"""
+        if self.error is not None:
+            raise self.error
+        return self.response.item()
+
+    def __repr__(self):
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"ItemResult(item_id={self.item_id}, {state})"
+
+
+class StoryLists:
+    """
+    Stories of several story lists fetched together, see
+    `HackerNewsClient.get_story_lists`. Every unique story is fetched once and
+    shared by all lists containing it.
+    """
+
+    def __init__(self, ids: dict, results: dict):
+        self.ids = ids  # list name -> story IDs in list order
+        self.results = results  # story ID -> ItemResult
+
+    def __getitem__(self, name) -> List[ItemResult]:
+        """ItemResults of list `name` in list order"""
+        return [self.results[item_id] for item_id in self.ids[name]]
+
+    @property
+    def total(self):
+        """Number of list entries, duplicates across lists included"""
+        return sum(len(ids) for ids in self.ids.values())
+
+    @property
+    def unique(self):
+        """Number of distinct stories, i.e. item requests needed"""
+        return len(self.results)
+
+    def __repr__(self):
+        return f"StoryLists(lists={list(self.ids)}, total={self.total}, unique={self.unique})"
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config import settings
+from core.api.api_response import ApiResponse
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+
+class CacheStats:
+    """Counters of a `ResponseCache`"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self):
+        return (
+            f"CacheStats(hits={self.hits}, misses={self.misses}, "
+            f"hit_rate={self.hit_rate:.1%}, evictions={self.evictions}, "
+            f"expirations={self.expirations})"
+        )
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of `ApiResponse` objects keyed by (endpoint, id).
+
+    Every entry expires after the TTL of its endpoint (see the `cache.ttl`
+    section of settings.yaml). Deleted and dead items never change again and
+    use the `final_item` TTL. Past `max_entries` the least recently used entry
+    is evicted.
+    """
+
+    def __init__(self, max_entries: int = None, ttl: dict = None, clock=time.monotonic):
+        self.max_entries = max_entries or settings.cache.max_entries
+        self.ttl = dict(settings.cache.ttl)
+        self.ttl.update(ttl or {})
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, response)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key) -> ApiResponse:
+        """Return the cached response or None if missing or expired"""
+        with self._lock:
+            response = self._lookup(key)
+            if response is not None:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+            return response
+
+    def set(self, key, response: ApiResponse):
+        """Cache a response with the TTL of its endpoint, `key[0]`"""
+        self._put(key, self.ttl_for(key, response), response)
+
+    def _lookup(self, key):
+        """Fresh response for `key` or None, the caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at is None or expires_at > self._clock():
+            self._entries.move_to_end(key)
+            return response
+        del self._entries[key]
+        self.stats.expirations += 1
+        return None
+
+    def _put(self, key, ttl, response):
+        expires_at = None if ttl is None else self._clock() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def ttl_for(self, key, response: ApiResponse):
+        endpoint = key[0]
+        if endpoint == "item":
+            item = response.json()
+            if isinstance(item, dict) and (item.get("deleted") or item.get("dead")):
+                return self.ttl["final_item"]
+        return self.ttl[endpoint]
+
+    def discard(self, key):
+        """Drop an entry that is known to be outdated"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
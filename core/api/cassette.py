@@ -0,0 +1,158 @@
+import datetime
+import json
+import mmap
+import os
+import threading
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config import ROOT_DIR, settings
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class Cassette:
+    """
+    Append-only on-disk store of HTTP responses for record/replay runs.
+
+    Every record is self-describing:
+
+        b"<key length> <meta length> <body length>\\n" + key + meta + body
+
+    where `key` identifies the request (verb, url and query), `meta` is JSON
+    with status, reason, headers and elapsed time, and `body` is the raw
+    response content. Records are appended with a single write, so a later
+    recording of the same request wins. On replay the file is memory-mapped
+    and only the record headers are scanned to build the key index; bodies
+    are sliced out of the map when a request is played back.
+    """
+
+    def __init__(self, path, mode):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}', expected {RECORD} or {REPLAY}")
+        self.path = path if os.path.isabs(path) else os.path.join(ROOT_DIR, path)
+        self.mode = mode
+        self._index = None  # key -> (offset, meta length, body length)
+        self._mmap = None
+        self._lock = threading.Lock()
+
+    @property
+    def replaying(self):
+        return self.mode == REPLAY
+
+    @staticmethod
+    def request_key(verb, url, params=None):
+        query = f"?{urlencode(sorted(params.items()))}" if params else ""
+        return f"{verb.upper()} {url}{query}"
+
+    def record(self, verb, url, params, response):
+        """Append a `requests` or `httpx` response"""
+        key = self.request_key(verb, url, params).encode()
+        meta = response_meta(response).encode()
+        body = response.content
+        record = b"%d %d %d\n" % (len(key), len(meta), len(body)) + key + meta + body
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, record)
+            finally:
+                os.close(fd)
+
+    def play(self, verb, url, params=None) -> requests.Response:
+        """Return the recorded response for the request as `requests.Response`"""
+        key = self.request_key(verb, url, params)
+        with self._lock:
+            if self._index is None:
+                self._load()
+        try:
+            offset, meta_length, body_length = self._index[key]
+        except KeyError:
+            raise ConnectionError(
+                f"Failed to get response\nNo recorded response for `{key}` in {self.path}"
+            ) from None
+        return build_response(
+            url,
+            self._mmap[offset:offset + meta_length],
+            self._mmap[offset + meta_length:offset + meta_length + body_length],
+        )
+
+    def _load(self):
+        """Map the cassette and index its records without parsing the bodies"""
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            raise FileNotFoundError(
+                f"Cassette {self.path} is empty, record it first with ENV_FOR_DYNACONF=record"
+            )
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        index = {}
+        position, size = 0, len(self._mmap)
+        while position < size:
+            line_end = self._mmap.find(b"\n", position)
+            key_length, meta_length, body_length = map(int, self._mmap[position:line_end].split())
+            key_start = line_end + 1
+            meta_start = key_start + key_length
+            index[self._mmap[key_start:meta_start].decode()] = (meta_start, meta_length, body_length)
+            position = meta_start + meta_length + body_length
+        self._index = index
+        logger.info(f"Loaded {len(index)} recorded responses from {self.path}")
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+                self._index = None
+
+
+def response_meta(response) -> str:
+    """Status, reason, headers and elapsed time of a `requests` or `httpx`
+    response as compact JSON"""
+    return json.dumps(
+        {
+            "status": response.status_code,
+            "reason": getattr(response, "reason", None) or getattr(response, "reason_phrase", ""),
+            "headers": dict(response.headers),
+            "elapsed": response.elapsed.total_seconds(),
+        },
+        separators=(",", ":"),
+    )
+
+
+def build_response(url, meta, body: bytes) -> requests.Response:
+    """Rebuild a `requests.Response` from `response_meta()` JSON and the body"""
+    meta = json.loads(meta)
+    response = requests.Response()
+    response.status_code = meta["status"]
+    response.reason = meta["reason"]
+    response.headers = CaseInsensitiveDict(meta["headers"])
+    response.elapsed = datetime.timedelta(seconds=meta["elapsed"])
+    response.url = url
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response._content = body
+    return response
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette():
+    """Cassette configured by the `cassette` settings, None outside record/replay
+
+    One instance per path is shared by all clients of the process.
+    """
+    mode = settings.cassette.mode
+    if not mode:
+        return None
+    path = settings.cassette.path
+    with _cassettes_lock:
+        if (path, mode) not in _cassettes:
+            _cassettes[(path, mode)] = Cassette(path, mode)
+        return _cassettes[(path, mode)]
@@ -0,0 +1,224 @@
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from config import settings
+from core.api.api_response import ApiResponse
+from core.api.cassette import get_cassette
+from core.api.metrics import RequestTrace, endpoint_name, get_metrics
+from core.api.rate_limiter import backoff_delay, get_rate_limiter, parse_retry_after
+from core.api.single_flight import AsyncSingleFlight, flight_key
+from core.api.clients.base_client import format_request, log_request, log_response
+from core.api.clients.transports import astream_request
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+
+class AsyncBaseClient:
+    """Asyncio sibling of `BaseClient` for GET requests only"""
+
+    def __init__(
+        self,
+        url: str,
+        retry_codes: List = None,
+        pool_maxsize: int = None,
+        keep_alive: bool = None,
+    ):
+        """Initialize the async base client
+
+        One `httpx.AsyncClient` is created on first use and lives until
+        `aclose()`; it must be used from a single event loop.
+        """
+        self.url = url
+        self.retry_codes = [429] if not retry_codes else retry_codes
+        self.pool_maxsize = pool_maxsize or settings.pool.maxsize
+        self.keep_alive = settings.pool.keep_alive if keep_alive is None else keep_alive
+        self.cassette = get_cassette()  # record/replay, see settings.yaml
+        self.rate_limiter = get_rate_limiter(url)  # shared per host, None if disabled
+        self.metrics = get_metrics()  # shared by all clients, None if disabled
+        self.single_flight = AsyncSingleFlight() if settings.coalesce_requests else None
+        self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Long-lived async client shared by all requests of this client"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=None,  # same as requests, queued requests wait for the pool
+                limits=httpx.Limits(
+                    max_connections=self.pool_maxsize,
+                    max_keepalive_connections=self.pool_maxsize if self.keep_alive else 0,
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close pooled connections, the client is recreated on next request"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def send(
+        self,
+        verb,
+        url,
+        headers=None,
+        params=None,
+        follow_redirects=True,
+        code=None,
+        message=None,
+        validate=True,
+    ):
+        """Send a GET request (only GET is supported)
+
+        Requests share the rate limiter of `BaseClient`; connection errors and
+        responses with a status in `retry_codes` are retried with the same
+        jittered backoff and retry budget. Identical requests in flight on
+        this client share one network call and its `ApiResponse`.
+        """
+        start = time.perf_counter()
+        client = self.client
+        metrics = self.metrics
+        endpoint = endpoint_name(url) if metrics is not None else None
+
+        params = (
+            {k: v for k, v in params.items() if v is not None} if params else None
+        )  # remove empty query params
+
+        if message:
+            logger.info(message[:1].upper() + message[1:])
+        else:
+            logger.warning(f"Please add log message for `{verb} {url}`")
+
+        if settings.detailed_logs:  # for tracing logs
+            log_request(url, verb, params, client.headers, headers)
+
+        try:
+            if self.single_flight is not None:
+                key = flight_key(verb, url, params, headers, follow_redirects)
+                response = await self.single_flight.do(
+                    key, self._fetch, client, verb, url, headers, params, follow_redirects, endpoint
+                )
+            else:
+                response = await self._fetch(client, verb, url, headers, params, follow_redirects, endpoint)
+        except ConnectionError:
+            if metrics is not None:
+                metrics.count(endpoint, "errors")
+            raise
+        if metrics is not None:
+            metrics.observe(endpoint, "send", time.perf_counter() - start)
+
+        if validate and code and response.status_code() != code:
+            response.raise_error(
+                f"Failed to {message}\n"
+                f"Status code: {response.status_code()} ({code} expected)"
+            )
+        return response
+
+    async def _fetch(self, client, verb, url, headers, params, follow_redirects, endpoint) -> ApiResponse:
+        if self.cassette is not None and self.cassette.replaying:
+            response = self.cassette.play(verb, url, params)
+        else:
+            response = await self._request_with_retries(
+                client, verb, url, headers, params, follow_redirects, endpoint
+            )
+            if self.cassette is not None:
+                self.cassette.record(verb, url, params, response)
+
+        if settings.detailed_logs:
+            log_response(response)
+        on_decode = self.metrics.decode_observer(endpoint) if self.metrics is not None else None
+        api_response = ApiResponse(response, response.elapsed, on_decode)
+        return api_response.release() if settings.response.stream else api_response
+
+    async def _request_with_retries(
+        self, client, verb, url, headers, params, follow_redirects, endpoint
+    ):
+        limiter = self.rate_limiter
+        metrics = self.metrics
+        total = settings.retry.total
+        stream, max_body_size = settings.response.stream, settings.response.max_body_size
+        for attempt in range(total + 1):
+            if limiter is not None:
+                await limiter.acquire_async()
+            if attempt and metrics is not None:
+                metrics.count(endpoint, "retries")
+            retry_after = None
+            trace = RequestTrace() if metrics is not None else None
+            start = time.perf_counter()
+            try:
+                if stream:
+                    response = await astream_request(
+                        client, verb, url, headers, params, follow_redirects, trace, max_body_size
+                    )
+                else:
+                    response = await client.request(
+                        verb,
+                        url,
+                        headers=headers,
+                        params=params,
+                        follow_redirects=follow_redirects,
+                        extensions={"trace": trace.atrace} if trace is not None else None,
+                    )
+            except httpx.HTTPError as e:
+                error = str(e) or repr(e)
+            except ConnectionError as e:  # body above response.max_body_size
+                raise ConnectionError(f"Failed to get response\n{e}") from None
+            else:
+                if metrics is not None:
+                    metrics.record_response(endpoint, response, time.perf_counter() - start, trace)
+                if response.status_code not in self.retry_codes:
+                    if limiter is not None:
+                        limiter.on_success()
+                    return response
+                error = f"too many {response.status_code} error responses"
+                retry_after = parse_retry_after(response)
+                if limiter is not None:
+                    limiter.on_throttled(retry_after)
+                await response.aclose()
+            if attempt == total or (limiter is not None and not limiter.allow_retry()):
+                break
+            delay = backoff_delay(attempt, retry_after)
+            logger.warning(f"Retrying ({total - attempt - 1} left) in {delay:.2f}s after {error}: {url}")
+            await asyncio.sleep(delay)
+        raise ConnectionError(
+            f"Failed to get response\nMax retries exceeded with url: {url} ({error})"
+        )
+
+    def request_as_text(self, url, verb, params, headers=None):
+        """Format request as text for logging"""
+        request_headers = httpx.Headers(self.client.headers)
+        if headers:
+            request_headers.update(headers)
+        return format_request(url, verb, params, request_headers)
+
+    async def get(
+        self,
+        url,
+        headers=None,
+        params=None,
+        follow_redirects=True,
+        code=None,
+        message=None,
+        validate=True,
+    ):
+        """Send a GET request"""
+        return await self.send(
+            "get",
+            url,
+            headers=headers,
+            params=params,
+            follow_redirects=follow_redirects,
+            code=code,
+            message=message,
+            validate=validate,
+        )
@@ -0,0 +1,139 @@
+import asyncio
+from itertools import chain
+from typing import AsyncIterator, Iterable, List
+
+from config import settings
+from core.api.api_response import ApiResponse, ItemResult, StoryLists
+from core.api.cache import ResponseCache
+from core.api.clients.async_base_client import AsyncBaseClient
+from core.api.clients.hackernews_client import STORY_LISTS
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+
+class AsyncHackerNewsClient(AsyncBaseClient):
+    def __init__(self, url=None, cache: ResponseCache = None, **kwargs):
+        """`cache` is an optional ResponseCache shared between clients"""
+        super().__init__(url or settings.url, **kwargs)
+        self.cache = cache
+
+    async def get_top_stories(self, validate: bool = True) -> ApiResponse:
+        return await self.get_story_list("top", validate)
+
+    async def get_story_list(self, name: str, validate: bool = True) -> ApiResponse:
+        """IDs of a story list, `name` is one of STORY_LISTS (`new` -> `newstories.json`)"""
+        if name not in STORY_LISTS:
+            raise ValueError(f"Unknown story list '{name}', expected one of {', '.join(STORY_LISTS)}")
+        return await self._cached_get(
+            ("stories", name),
+            f"{self.url}/v0/{name}stories.json",
+            message=f"get {name} stories",
+            validate=validate,
+        )
+
+    async def get_story_lists(
+        self,
+        names: Iterable[str] = STORY_LISTS,
+        limit: int = None,
+        max_concurrency: int = None,
+        validate: bool = True,
+    ) -> StoryLists:
+        """Same as `HackerNewsClient.get_story_lists` on the current event loop"""
+        names = list(dict.fromkeys(names))
+        responses = await asyncio.gather(*(self.get_story_list(name, validate) for name in names))
+        ids = {name: response.json()[:limit] for name, response in zip(names, responses)}
+        unique_ids = list(dict.fromkeys(chain.from_iterable(ids.values())))
+        results = await self.get_items(unique_ids, max_concurrency, validate)
+        story_lists = StoryLists(ids, dict(zip(unique_ids, results)))
+        logger.info(f"Fetched {story_lists.unique} unique stories for {story_lists.total} entries of {len(names)} lists")
+        return story_lists
+
+    async def get_item(self, item_id: int, validate: bool = True) -> ApiResponse:
+        return await self._cached_get(
+            ("item", item_id),
+            f"{self.url}/v0/item/{item_id}.json",
+            message="get item",
+            validate=validate,
+        )
+
+    async def get_max_item(self, validate: bool = True) -> ApiResponse:
+        """Current largest item ID, never cached"""
+        return await self.get(
+            f"{self.url}/v0/maxitem.json", code=200, message="get max item", validate=validate
+        )
+
+    async def get_updates(self, validate: bool = True) -> ApiResponse:
+        """
+        Recently changed items and profiles, never cached.
+
+        Changed items are dropped from `self.cache` so the next `get_item`
+        fetches them again.
+        """
+        response = await self.get(
+            f"{self.url}/v0/updates.json", code=200, message="get updates", validate=validate
+        )
+        if self.cache is not None and response.status_code() == 200:
+            for item_id in (response.json() or {}).get("items", []):
+                self.cache.discard(("item", item_id))
+        return response
+
+    async def _cached_get(self, key, url, message, validate) -> ApiResponse:
+        """GET with status 200 expected, served from `self.cache` when fresh"""
+        if self.cache is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                logger.debug(f"Cache hit: {message} {key}")
+                return response
+        response = await self.get(url, code=200, message=message, validate=validate)
+        if self.cache is not None and response.status_code() == 200:
+            self.cache.set(key, response)
+        return response
+
+    async def get_items(
+        self, item_ids: Iterable[int], max_concurrency: int = None, validate: bool = True
+    ) -> List[ItemResult]:
+        """
+        Fetch several items concurrently on the current event loop.
+
+        Args:
+            item_ids: Item IDs to fetch
+            max_concurrency: Max in-flight requests, defaults to the pool maxsize
+            validate: Validate status code of every item response
+
+        Returns:
+            list: ItemResult per ID in input order; a failed fetch is reported
+            on its ItemResult and does not abort the rest of the batch
+        """
+        item_ids = list(item_ids)
+        semaphore = asyncio.Semaphore(max_concurrency or self.pool_maxsize)
+        unique_ids = list(dict.fromkeys(item_ids))
+        results = await asyncio.gather(
+            *(self._get_item_result(item_id, semaphore, validate) for item_id in unique_ids)
+        )
+        results = dict(zip(unique_ids, results))
+        return [results[item_id] for item_id in item_ids]
+
+    async def iter_items(
+        self, item_ids: Iterable[int], max_concurrency: int = None, validate: bool = True
+    ) -> AsyncIterator[ItemResult]:
+        """Same as `get_items` but yields ItemResults as soon as they complete"""
+        semaphore = asyncio.Semaphore(max_concurrency or self.pool_maxsize)
+        tasks = [
+            asyncio.ensure_future(self._get_item_result(item_id, semaphore, validate))
+            for item_id in dict.fromkeys(item_ids)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:  # stop pending fetches if the consumer stops early
+            for task in tasks:
+                task.cancel()
+
+    async def _get_item_result(self, item_id, semaphore, validate) -> ItemResult:
+        async with semaphore:
+            try:
+                return ItemResult(item_id, response=await self.get_item(item_id, validate))
+            except Exception as e:
+                logger.warning(f"Failed to get item {item_id}: {e}")
+                return ItemResult(item_id, error=e)
@@ -1,16 +1,23 @@
 import json as json_lib
+import logging
+import threading
+import time
 from typing import List
 from urllib.parse import urlparse
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3 import Retry
+from requests.structures import CaseInsensitiveDict
 
 from config import settings
 from core.api.api_response import ApiResponse
+from core.api.cassette import get_cassette
+from core.api.clients.transports import Transport, create_transport
+from core.api.metrics import RequestTrace, endpoint_name, get_metrics
+from core.api.rate_limiter import backoff_delay, get_rate_limiter, parse_retry_after
+from core.api.single_flight import flight_key, get_single_flight
 from core.logconfig import get_logger
 
 logger = get_logger(__name__)
+trace_logger = get_logger("core.api.trace")  # request/response dumps, file only
 
 class BaseClient:
     """Base class for API clients for GET requests only"""
@@ -19,16 +26,62 @@ class BaseClient:
         self,
         url: str,
         retry_codes: List = None,
+        pool_connections: int = None,
+        pool_maxsize: int = None,
+        keep_alive: bool = None,
+        transport: str = None,
     ):
-        """Initialize the base client"""
+        """Initialize the base client
+
+        Connection pool options and the transport (`http1` or `http2`, see
+        `core/api/clients/transports.py`) default to the `pool` section of
+        settings.yaml. The transport is created on first use and lives until
+        `close()`.
+        """
         self.url = url
         self.retry_codes = [429] if not retry_codes else retry_codes
-        self._session = None
+        self.pool_connections = pool_connections or settings.pool.connections
+        self.pool_maxsize = pool_maxsize or settings.pool.maxsize
+        self.keep_alive = settings.pool.keep_alive if keep_alive is None else keep_alive
+        self.transport_name = transport or settings.pool.transport
+        self.cassette = get_cassette()  # record/replay, see settings.yaml
+        self.rate_limiter = get_rate_limiter(url)  # shared per host, None if disabled
+        self.metrics = get_metrics()  # shared by all clients, None if disabled
+        self.single_flight = get_single_flight(url)  # shared per host, None if disabled
+        self._transport = None
+        self._transport_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def transport(self) -> Transport:
+        """Long-lived transport shared by all requests of this client"""
+        if self._transport is None:
+            with self._transport_lock:  # batch threads must not each create one
+                if self._transport is None:
+                    self._transport = self._create_transport()
+        return self._transport
+
+    def _create_transport(self) -> Transport:
+        return create_transport(
+            self.transport_name, self.url, self.pool_connections, self.pool_maxsize, self.keep_alive
+        )
+
+    def close(self):
+        """Close pooled connections, the transport is recreated on next request"""
+        with self._transport_lock:
+            if self._transport is not None:
+                self._transport.close()
+                self._transport = None
 
     def update_headers(self, headers):
-        """Update request headers with data provided from the test/client"""
+        """Update default headers sent with every request of this client"""
         if headers:
-            self._session.headers.update(headers)
+            self.transport.headers.update(headers)
 
     def send(
         self,
@@ -41,55 +94,122 @@ class BaseClient:
         message=None,
         validate=True,
     ):
-        """Send a GET request (only GET is supported)"""
-        self._session = requests.Session()
-
-        retries = Retry(
-            total=4,
-            backoff_factor=1,
-            status_forcelist=self.retry_codes,
-            allowed_methods=frozenset(["GET"]),
-        )
-        self._session.mount("http://", HTTPAdapter(max_retries=retries))
-        self._session.mount("https://", HTTPAdapter(max_retries=retries))
+        """Send a GET request (only GET is supported)
 
-        self.update_headers(headers)
+        Per-call headers and params are passed to this request only and are
+        never written to the transport's default headers. Requests go through the shared
+        rate limiter and responses with a status in `retry_codes` are retried
+        with jittered backoff while the limiter's retry budget allows.
+        Identical requests in flight at the same time share one network call
+        and its `ApiResponse` (see `coalesce_requests` in settings.yaml).
+        """
+        start = time.perf_counter()
+        transport = self.transport
+        metrics = self.metrics
+        endpoint = endpoint_name(url) if metrics is not None else None
 
         params = (
             {k: v for k, v in params.items() if v is not None} if params else None
         )  # remove empty query params
-        self._session.params = params
 
         if message:
             logger.info(message[:1].upper() + message[1:])
         else:
             logger.warning(f"Please add log message for `{verb} {url}`")
-        
+
         if settings.detailed_logs:  # for tracing logs
-            processed_request_txt = self.request_as_text(
-                url, verb, params
-            )
-            log_request(processed_request_txt)
-        
+            log_request(url, verb, params, transport.headers, headers)
+
         try:
-            response = self._session.request(
-                verb,
-                url,
-                verify=True,
-                allow_redirects=follow_redirects,
+            if self.single_flight is not None:
+                request_headers = CaseInsensitiveDict(transport.headers)
+                if headers:
+                    request_headers.update(headers)
+                key = flight_key(verb, url, params, request_headers, follow_redirects)
+                response = self.single_flight.do(
+                    key, self._fetch, transport, verb, url, headers, params, follow_redirects, endpoint
+                )
+            else:
+                response = self._fetch(transport, verb, url, headers, params, follow_redirects, endpoint)
+        except ConnectionError:
+            if metrics is not None:
+                metrics.count(endpoint, "errors")
+            raise
+        if metrics is not None:
+            metrics.observe(endpoint, "send", time.perf_counter() - start)
+
+        if validate and code and response.status_code() != code:
+            response.raise_error(
+                f"Failed to {message}\n"
+                f"Status code: {response.status_code()} ({code} expected)"
+            )
+        return response
+
+    def _fetch(self, transport, verb, url, headers, params, follow_redirects, endpoint) -> ApiResponse:
+        if self.cassette is not None and self.cassette.replaying:
+            response = self.cassette.play(verb, url, params)
+        else:
+            response = self._request_with_retries(
+                transport, verb, url, headers, params, follow_redirects, endpoint
             )
-        except Exception as e:
-            raise ConnectionError("Failed to get response\n" + str(e)) from None
-        
+            if self.cassette is not None:
+                self.cassette.record(verb, url, params, response)
+
         if settings.detailed_logs:
             log_response(response)
+        on_decode = self.metrics.decode_observer(endpoint) if self.metrics is not None else None
+        api_response = ApiResponse(response, response.elapsed, on_decode)
+        return api_response.release() if settings.response.stream else api_response
 
-        if validate and code and response.status_code != code:
-            ApiResponse(response).raise_error(
-                f"Failed to {message}\n"
-                f"Status code: {response.status_code} ({code} expected)"
+    def _request_with_retries(
+        self, transport, verb, url, headers, params, follow_redirects, endpoint
+    ):
+        limiter = self.rate_limiter
+        metrics = self.metrics
+        total = settings.retry.total
+        stream, max_body_size = settings.response.stream, settings.response.max_body_size
+        for attempt in range(total + 1):
+            if limiter is not None:
+                limiter.acquire()
+            if attempt and metrics is not None:
+                metrics.count(endpoint, "retries")
+            trace = RequestTrace() if metrics is not None else None
+            start = time.perf_counter()
+            try:
+                response = transport.request(
+                    verb,
+                    url,
+                    headers=headers,
+                    params=params,
+                    follow_redirects=follow_redirects,
+                    trace=trace,
+                    stream=stream,
+                    max_body_size=max_body_size,
+                )
+            except Exception as e:
+                raise ConnectionError("Failed to get response\n" + str(e)) from None
+            if metrics is not None:
+                metrics.record_response(endpoint, response, time.perf_counter() - start, trace)
+            if response.status_code not in self.retry_codes:
+                if limiter is not None:
+                    limiter.on_success()
+                return response
+            retry_after = parse_retry_after(response)
+            if limiter is not None:
+                limiter.on_throttled(retry_after)
+            if attempt == total or (limiter is not None and not limiter.allow_retry()):
+                break
+            response.close()
+            delay = backoff_delay(attempt, retry_after)
+            logger.warning(
+                f"Retrying ({total - attempt - 1} left) in {delay:.2f}s after "
+                f"{response.status_code} response: {url}"
             )
-        return ApiResponse(response, response.elapsed)
+            time.sleep(delay)
+        raise ConnectionError(
+            f"Failed to get response\nMax retries exceeded with url: {url} "
+            f"(too many {response.status_code} error responses)"
+        )
 
     def get(
         self,
@@ -113,46 +233,87 @@ class BaseClient:
             validate=validate,
         )
 
-    def request_as_text(self, url, verb, params):
+    def request_as_text(self, url, verb, params, headers=None):
         """Format request as text for logging"""
-        host = urlparse(url).netloc
-        query = (
-            ("?" + "&".join("%s=%s" % (k, v) for k, v in list(params.items())))
-            if params
-            else ""
-        )
-        path = f"{urlparse(url).path}{query}"
-        headers = "\n".join(
-            [": ".join([k, v]) for k, v in list(self._session.headers.items())]
-        )
-        return f"{verb.upper()} {path} HTTP/1.1\nHost: {host}\n{headers}\n"
+        request_headers = CaseInsensitiveDict(self.transport.headers)
+        if headers:
+            request_headers.update(headers)
+        return format_request(url, verb, params, request_headers)
+
+
+def format_request(url, verb, params, headers):
+    """Format request line, host and headers as HTTP/1.1 text"""
+    host = urlparse(url).netloc
+    query = (
+        ("?" + "&".join("%s=%s" % (k, v) for k, v in list(params.items())))
+        if params
+        else ""
+    )
+    path = f"{urlparse(url).path}{query}"
+    headers = "\n".join([": ".join([k, v]) for k, v in list(headers.items())])
+    return f"{verb.upper()} {path} HTTP/1.1\nHost: {host}\n{headers}\n"
+
+
+class LazyText:
+    """Log message argument rendered only when a handler formats the record"""
 
+    __slots__ = ("func", "args")
 
-def log_request(request_txt):
-    logger.debug(f"Request\n{request_txt}\n{'-' * 25} End of request {'-' * 25}")
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return self.func(*self.args)
+
+
+def log_request(url, verb, params, default_headers, headers=None):
+    """Trace the request as text. Headers are merged and copied now, as sent;
+    only the text is built lazily, on the log listener thread"""
+    if trace_logger.isEnabledFor(logging.DEBUG):
+        request_headers = CaseInsensitiveDict(default_headers)
+        if headers:
+            request_headers.update(headers)
+        trace_logger.debug("%s", LazyText(_request_message, url, verb, params, request_headers))
 
 
 def log_response(response):
-    content_type = (
-        response.headers["Content-Type"]
-        if "Content-Type" in response.headers
-        else "undefined"
-    )
-    if response.text and "json" in content_type:
+    """Trace response status, headers and body. They are copied now, the body
+    up to `log_body_limit` bytes, so the queued record does not keep the
+    response alive; the text is built lazily, on the log listener thread"""
+    if trace_logger.isEnabledFor(logging.DEBUG):
+        content = response.content
+        reason = getattr(response, "reason", None) or getattr(response, "reason_phrase", "")
+        trace_logger.debug("%s", LazyText(
+            _response_message,
+            response.status_code,
+            reason,
+            CaseInsensitiveDict(response.headers),
+            response.elapsed,
+            content[:settings.log_body_limit],
+            len(content),
+        ))
+
+
+def _request_message(url, verb, params, headers):
+    return f"Request\n{format_request(url, verb, params, headers)}\n{'-' * 25} End of request {'-' * 25}"
+
+
+def _response_message(status_code, reason, headers, elapsed, body: bytes, size):
+    content_type = headers.get("Content-Type", "undefined")
+    text = body.decode(errors="replace")
+    if size > len(body):  # too big to pretty-print
+        response_body = f"{text}\n... ({size - len(body)} more bytes truncated)"
+    elif text and "json" in content_type:
         try:
-            response_body = json_lib.dumps(
-                response.json(), indent=4, sort_keys=True
-            )
+            response_body = json_lib.dumps(json_lib.loads(body), indent=4, sort_keys=True)
         except ValueError as e:
-            logger.warning(f"Failed to parse response JSON body. {e}")
-            response_body = response.text
+            response_body = f"{text}\n(failed to parse response JSON body. {e})"
     else:
-        response_body = response.text
+        response_body = text
 
-    response_headers = "\n".join(
-        [": ".join([k, v]) for k, v in list(response.headers.items())]
-    )
-    logger.debug(
-        f"Response ({response.elapsed})\nHTTP/1.1 {response.status_code} {response.reason}\n"
+    response_headers = "\n".join([": ".join([k, v]) for k, v in list(headers.items())])
+    return (
+        f"Response ({elapsed})\nHTTP/1.1 {status_code} {reason}\n"
         f"{response_headers}\n\n{response_body}\n{'-' * 25} End of response {'-' * 25}"
     )
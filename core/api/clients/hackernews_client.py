@@ -1,27 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
+from typing import Iterable, Iterator, List
+
 from config import settings
-from core.api.api_response import ApiResponse
+from core.api.api_response import ApiResponse, ItemResult, StoryLists
+from core.api.cache import ResponseCache
 from core.api.clients.base_client import BaseClient
+from core.api.items import Item
 from core.logconfig import get_logger
 
 logger = get_logger(__name__)
 
+STORY_LISTS = ("top", "new", "best", "ask", "show", "job")
+
 
 class HackerNewsClient(BaseClient):
-    def __init__(self, url=None, **kwargs):
+    def __init__(self, url=None, cache: ResponseCache = None, **kwargs):
+        """`cache` is an optional ResponseCache shared between clients"""
         super().__init__(url or settings.url, **kwargs)
+        self.cache = cache
 
     def get_top_stories(self, validate: bool = True) -> ApiResponse:
-        return self.get(
-            f"{self.url}/v0/topstories.json",
-            code=200,
-            message="get top stories",
+        return self.get_story_list("top", validate)
+
+    def get_story_list(self, name: str, validate: bool = True) -> ApiResponse:
+        """IDs of a story list, `name` is one of STORY_LISTS (`new` -> `newstories.json`)"""
+        if name not in STORY_LISTS:
+            raise ValueError(f"Unknown story list '{name}', expected one of {', '.join(STORY_LISTS)}")
+        return self._cached_get(
+            ("stories", name),
+            f"{self.url}/v0/{name}stories.json",
+            message=f"get {name} stories",
             validate=validate,
         )
 
+    def get_story_lists(
+        self,
+        names: Iterable[str] = STORY_LISTS,
+        limit: int = None,
+        max_concurrency: int = None,
+        validate: bool = True,
+    ) -> StoryLists:
+        """
+        Fetch several story lists and their stories at once.
+
+        The lists overlap heavily, so their IDs are merged into one
+        deduplicated batch: every story is fetched once through `iter_items`
+        and each list is rebuilt in order from the ID -> result index.
+
+        Args:
+            names: Story lists to fetch, see STORY_LISTS
+            limit: Only the first `limit` stories of every list, None for all
+            max_concurrency: Max in-flight item requests, defaults to the pool maxsize
+            validate: Validate status code of every response
+
+        Returns:
+            StoryLists: `story_lists["new"]` is the list of ItemResults of `new`
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return StoryLists({}, {})
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            responses = executor.map(lambda name: self.get_story_list(name, validate), names)
+            ids = {name: response.json()[:limit] for name, response in zip(names, responses)}
+        unique_ids = list(dict.fromkeys(chain.from_iterable(ids.values())))
+        results = {result.item_id: result for result in self.iter_items(unique_ids, max_concurrency, validate)}
+        story_lists = StoryLists(ids, results)
+        logger.info(f"Fetched {story_lists.unique} unique stories for {story_lists.total} entries of {len(names)} lists")
+        return story_lists
+
     def get_item(self, item_id: int, validate: bool = True) -> ApiResponse:
-        return self.get(
+        return self._cached_get(
+            ("item", item_id),
             f"{self.url}/v0/item/{item_id}.json",
-            code=200,
             message="get item",
             validate=validate,
         )
+
+    def get_item_record(self, item_id: int, validate: bool = True) -> Item:
+        """Item as a compact `Item` record, None if it does not exist"""
+        return self.get_item(item_id, validate).item()
+
+    def get_max_item(self, validate: bool = True) -> ApiResponse:
+        """Current largest item ID, never cached"""
+        return self.get(
+            f"{self.url}/v0/maxitem.json", code=200, message="get max item", validate=validate
+        )
+
+    def get_updates(self, validate: bool = True) -> ApiResponse:
+        """
+        Recently changed items and profiles, never cached.
+
+        Changed items are dropped from `self.cache` so the next `get_item`
+        fetches them again.
+        """
+        response = self.get(
+            f"{self.url}/v0/updates.json", code=200, message="get updates", validate=validate
+        )
+        if self.cache is not None and response.status_code() == 200:
+            for item_id in (response.json() or {}).get("items", []):
+                self.cache.discard(("item", item_id))
+        return response
+
+    def _cached_get(self, key, url, message, validate) -> ApiResponse:
+        """GET with status 200 expected, served from `self.cache` when fresh"""
+        if self.cache is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                logger.debug(f"Cache hit: {message} {key}")
+                return response
+        response = self.get(url, code=200, message=message, validate=validate)
+        if self.cache is not None and response.status_code() == 200:
+            self.cache.set(key, response)
+        return response
+
+    def get_items(
+        self, item_ids: Iterable[int], max_concurrency: int = None, validate: bool = True
+    ) -> List[ItemResult]:
+        """
+        Fetch several items concurrently over the shared connection pool.
+
+        Args:
+            item_ids: Item IDs to fetch
+            max_concurrency: Max in-flight requests, defaults to the pool maxsize
+            validate: Validate status code of every item response
+
+        Returns:
+            list: ItemResult per ID in input order; a failed fetch is reported
+            on its ItemResult and does not abort the rest of the batch
+        """
+        item_ids = list(item_ids)
+        results = {}
+        for result in self.iter_items(item_ids, max_concurrency, validate):
+            results[result.item_id] = result
+        return [results[item_id] for item_id in item_ids]
+
+    def iter_items(
+        self, item_ids: Iterable[int], max_concurrency: int = None, validate: bool = True
+    ) -> Iterator[ItemResult]:
+        """Same as `get_items` but yields ItemResults as soon as they complete"""
+        item_ids = list(dict.fromkeys(item_ids))  # drop duplicate IDs, keep order
+        if not item_ids:
+            return
+        workers = min(max_concurrency or self.pool_maxsize, len(item_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.get_item, item_id, validate): item_id
+                for item_id in item_ids
+            }
+            try:
+                for future in as_completed(futures):
+                    yield self._item_result(futures[future], future)
+            finally:  # stop pending fetches if the consumer stops early
+                for future in futures:
+                    future.cancel()
+
+    @staticmethod
+    def _item_result(item_id, future) -> ItemResult:
+        try:
+            return ItemResult(item_id, response=future.result())
+        except Exception as e:
+            logger.warning(f"Failed to get item {item_id}: {e}")
+            return ItemResult(item_id, error=e)
@@ -0,0 +1,211 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+
+from config import settings
+
+HTTP1 = "http1"
+HTTP2 = "http2"
+CHUNK_SIZE = 65536  # bytes read at a time from streamed bodies
+
+
+def _check_body_size(size, max_body_size, url):
+    if max_body_size and size > max_body_size:
+        raise ConnectionError(f"Response body of {url} exceeds {max_body_size} bytes (response.max_body_size)")
+
+
+def read_body(response, chunks, max_body_size, url) -> bytes:
+    """Read a streamed body, failing as soon as it exceeds `max_body_size`
+    bytes (0 for no limit); a larger `Content-Length` fails before reading"""
+    _check_body_size(int(response.headers.get("Content-Length", 0)), max_body_size, url)
+    body = bytearray()
+    for chunk in chunks:
+        body += chunk
+        _check_body_size(len(body), max_body_size, url)
+    return bytes(body)
+
+
+async def aread_body(response, chunks, max_body_size, url) -> bytes:
+    """Same as `read_body` for async chunk iterators"""
+    _check_body_size(int(response.headers.get("Content-Length", 0)), max_body_size, url)
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        _check_body_size(len(body), max_body_size, url)
+    return bytes(body)
+
+
+async def astream_request(client: httpx.AsyncClient, verb, url, headers, params, follow_redirects,
+                          trace, max_body_size):
+    """Send a request on an async httpx client and read its body with `aread_body`"""
+    request = client.build_request(
+        verb,
+        url,
+        headers=headers,
+        params=params,
+        extensions={"trace": trace.atrace} if trace is not None else None,
+    )
+    response = await client.send(request, stream=True, follow_redirects=follow_redirects)
+    try:
+        response._content = await aread_body(response, response.aiter_bytes(), max_body_size, url)
+    finally:
+        await response.aclose()
+    return response
+
+
+class Transport(ABC):
+    """
+    Sends the HTTP requests of a `BaseClient`.
+
+    A transport owns its connection pool for its whole lifetime and returns
+    `requests.Response` or `httpx.Response` objects, which `ApiResponse`, the
+    cassette and the trace logs all accept. Connection errors are retried by
+    the transport, `retry_codes` responses by the client.
+    """
+
+    name = None
+
+    @property
+    @abstractmethod
+    def headers(self):
+        """Default headers sent with every request, mutable"""
+
+    @abstractmethod
+    def request(self, verb, url, headers=None, params=None, follow_redirects=True, trace=None,
+                stream=False, max_body_size=0):
+        """Send one request; `trace` is a `RequestTrace` filled in by transports
+        that expose connection events. With `stream` the body is read in chunks
+        and a body above `max_body_size` bytes (0 for no limit) closes the
+        connection and raises ConnectionError."""
+
+    @abstractmethod
+    def close(self):
+        """Close every connection of the pool"""
+
+
+class RequestsTransport(Transport):
+    """HTTP/1.1 over a pooled `requests.Session`, one request per connection at a time"""
+
+    name = HTTP1
+
+    def __init__(self, url, pool_connections, pool_maxsize, keep_alive):
+        self.session = requests.Session()
+        retries = Retry(  # connection errors only, retry_codes are retried by the client
+            total=settings.retry.total,
+            backoff_factor=settings.retry.backoff_factor,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retries,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def request(self, verb, url, headers=None, params=None, follow_redirects=True, trace=None,
+                stream=False, max_body_size=0):
+        response = self.session.request(
+            verb,
+            url,
+            headers=headers,
+            params=params,
+            verify=True,
+            allow_redirects=follow_redirects,
+            stream=stream,
+        )
+        if stream:
+            try:
+                response._content = read_body(response, response.iter_content(CHUNK_SIZE), max_body_size, url)
+                response._content_consumed = True  # connection goes back to the pool on close
+            finally:
+                response.close()  # drops the connection if the body was not read to the end
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+class Http2Transport(Transport):
+    """
+    HTTP/2 over `httpx`, concurrent requests are multiplexed as streams of
+    one connection per host.
+
+    The sync `httpx.Client` does not keep HTTP/2 stream IDs in order when
+    several threads share a connection, so requests run on an
+    `httpx.AsyncClient` owned by an event loop thread and callers block on
+    the result. `https://` URLs negotiate HTTP/2 through ALPN (falling back
+    to HTTP/1.1), plain `http://` URLs speak HTTP/2 with prior knowledge, as
+    the stub server does with `http2` enabled.
+    """
+
+    name = HTTP2
+
+    def __init__(self, url, pool_connections, pool_maxsize, keep_alive):
+        self.client = httpx.AsyncClient(
+            timeout=None,  # same as requests, queued requests wait for a stream
+            transport=httpx.AsyncHTTPTransport(
+                http1=not url.startswith("http://"),
+                http2=True,
+                retries=settings.retry.total,  # connection errors only
+                limits=httpx.Limits(
+                    max_connections=pool_maxsize,
+                    max_keepalive_connections=pool_maxsize if keep_alive else 0,
+                ),
+            ),
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="http2-transport", daemon=True)
+        self._thread.start()
+
+    @property
+    def headers(self):
+        return self.client.headers
+
+    def request(self, verb, url, headers=None, params=None, follow_redirects=True, trace=None,
+                stream=False, max_body_size=0):
+        if stream:
+            coroutine = astream_request(
+                self.client, verb, url, headers, params, follow_redirects, trace, max_body_size
+            )
+        else:
+            coroutine = self.client.request(
+                verb,
+                url,
+                headers=headers,
+                params=params,
+                follow_redirects=follow_redirects,
+                extensions={"trace": trace.atrace} if trace is not None else None,
+            )
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+TRANSPORTS = {transport.name: transport for transport in (RequestsTransport, Http2Transport)}
+
+
+def create_transport(name, url, pool_connections, pool_maxsize, keep_alive) -> Transport:
+    """Transport registered as `name` (see `pool.transport` in settings.yaml)"""
+    try:
+        transport = TRANSPORTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transport '{name}', expected one of {', '.join(TRANSPORTS)}") from None
+    return transport(url, pool_connections, pool_maxsize, keep_alive)
@@ -0,0 +1,239 @@
+"""
+Bulk export of Hacker News items to gzip-compressed JSON Lines.
+
+Two crawls are supported:
+    top:    top stories, each followed by its whole comment tree
+    range:  every item in an ID range, by default 1 up to `maxitem`
+
+Items are fetched concurrently and written in chunks; every chunk is appended
+as a separate gzip member (the file stays readable with `gzip`/`zcat`) and
+then recorded in a checkpoint file next to the output. An interrupted export
+resumes after the last completed chunk, anything written after it is
+truncated first.
+
+Usage:
+    python -m core.api.export top --limit 100
+    python -m core.api.export range --start 1 --end 100000 --concurrency 100
+"""
+import argparse
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ROOT_DIR, settings
+from core.api.clients.hackernews_client import HackerNewsClient
+from core.api.helpers.comment_crawler import CommentTreeCrawler
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+TOP = "top"
+RANGE = "range"
+
+
+class ExportStats:
+    """Counters of an `Exporter` run"""
+
+    def __init__(self):
+        self.chunks = 0
+        self.exported = 0
+        self.missing = 0
+        self.failed = 0
+
+    def __repr__(self):
+        return (
+            f"ExportStats(chunks={self.chunks}, exported={self.exported}, "
+            f"missing={self.missing}, failed={self.failed})"
+        )
+
+
+class Exporter:
+    """
+    Resumable export of items to `output` (gzip JSON Lines).
+
+    Args:
+        client: HackerNewsClient instance to fetch items
+        mode: `top` or `range`
+        output: Path of the `.jsonl.gz` file, the checkpoint is `<output>.checkpoint`
+        start, end: ID range of the `range` mode, `end` defaults to `maxitem`
+        limit: Number of top stories of the `top` mode, None for all
+        max_depth: Comment levels crawled below each top story, None for all
+        concurrency: Max in-flight requests
+        chunk_size: IDs per chunk in `range` mode; in `top` mode `concurrency //
+            10` stories (at least one) are crawled side by side per chunk
+        restart: Ignore an existing checkpoint and start over
+
+    Failed fetches are retried by the client; IDs failing anyway are stored in
+    the checkpoint (`failed`) and skipped.
+    """
+
+    def __init__(
+        self,
+        client,
+        mode: str,
+        output: str,
+        start: int = 1,
+        end: int = None,
+        limit: int = None,
+        max_depth: int = None,
+        concurrency: int = None,
+        chunk_size: int = None,
+        restart: bool = False,
+    ):
+        if mode not in (TOP, RANGE):
+            raise ValueError(f"Unknown export mode '{mode}', expected {TOP} or {RANGE}")
+        self.client = client
+        self.mode = mode
+        self.output = output if os.path.isabs(output) else os.path.join(ROOT_DIR, output)
+        self.checkpoint_path = f"{self.output}.checkpoint"
+        self.concurrency = concurrency or settings.export.concurrency
+        self.chunk_size = chunk_size or settings.export.chunk_size
+        self.max_depth = max_depth
+        self.stats = ExportStats()
+        self.job = {"mode": mode, "start": start, "end": end, "limit": limit, "max_depth": max_depth}
+        self.checkpoint = None if restart else self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint["job"] != self.job:
+            raise ValueError(
+                f"Checkpoint {self.checkpoint_path} belongs to another export {checkpoint['job']}, "
+                f"use another output or restart"
+            )
+        logger.info(f"Resuming export to {self.output} at position {checkpoint['position']}")
+        return checkpoint
+
+    def _save_checkpoint(self):
+        temporary = f"{self.checkpoint_path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.checkpoint, f)
+        os.replace(temporary, self.checkpoint_path)  # atomic, never half written
+
+    def _start(self):
+        """Checkpoint of a new export: the IDs to export are fixed up front"""
+        if self.mode == TOP:
+            ids = self.client.get_top_stories().json()[:self.job["limit"]]
+        else:
+            end = self.job["end"] or self.client.get_max_item().json()
+            ids = [self.job["start"], end]  # bounds only
+        self.checkpoint = {"job": self.job, "ids": ids, "position": 0, "size": 0, "exported": 0, "failed": []}
+        os.makedirs(os.path.dirname(self.output), exist_ok=True)
+        open(self.output, "wb").close()
+        self._save_checkpoint()
+
+    def run(self, max_chunks: int = None) -> ExportStats:
+        """Export until done or `max_chunks` chunks were written"""
+        if self.checkpoint is None:
+            self._start()
+        with open(self.output, "r+b") as f:
+            f.truncate(self.checkpoint["size"])  # drop a chunk written after the last checkpoint
+        chunks = self._top_chunks() if self.mode == TOP else self._range_chunks()
+        for position, items, failed in chunks:
+            self._write(items)
+            self.checkpoint["position"] = position
+            self.checkpoint["size"] = os.path.getsize(self.output)
+            self.checkpoint["exported"] += len(items)
+            self.checkpoint["failed"].extend(failed)
+            self._save_checkpoint()
+            self.stats.chunks += 1
+            self.stats.exported += len(items)
+            self.stats.failed += len(failed)
+            logger.info(f"Exported {self.checkpoint['exported']} items to {self.output}, position {position}")
+            if max_chunks is not None and self.stats.chunks >= max_chunks:
+                break
+        logger.info(f"Export to {self.output}: {self.stats}")
+        return self.stats
+
+    def _write(self, items):
+        with gzip.open(self.output, "ab") as f:  # one gzip member per chunk
+            f.write(b"".join(json.dumps(item, separators=(",", ":")).encode() + b"\n" for item in items))
+
+    def _range_chunks(self):
+        first, last = self.checkpoint["ids"]
+        for chunk_start in range(first + self.checkpoint["position"], last + 1, self.chunk_size):
+            ids = range(chunk_start, min(chunk_start + self.chunk_size, last + 1))
+            items, failed = [], []
+            for result in self.client.get_items(ids, max_concurrency=self.concurrency):
+                if not result.ok:
+                    failed.append(result.item_id)
+                    continue
+                item = result.json()
+                if item is None:
+                    self.stats.missing += 1
+                    continue
+                items.append(item)
+            yield ids[-1] - first + 1, items, failed
+
+    def _top_chunks(self):
+        story_ids = self.checkpoint["ids"]
+        parallel = max(self.concurrency // 10, 1)
+        batch_size = max(self.concurrency // parallel, 1)
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            for position in range(self.checkpoint["position"], len(story_ids), parallel):
+                group = story_ids[position:position + parallel]
+                trees = executor.map(lambda story_id: self._story_tree(story_id, batch_size), group)
+                items, failed = [], []
+                for story_items, story_failed, missing in trees:
+                    items.extend(story_items)
+                    failed.extend(story_failed)
+                    self.stats.missing += missing
+                yield position + len(group), items, failed
+
+    def _story_tree(self, story_id, batch_size):
+        """Story followed by its comments, failed IDs and the number of `null` items"""
+        try:
+            story = self.client.get_item(story_id).json()
+        except Exception as e:
+            logger.warning(f"Failed to get story {story_id}: {e}")
+            return [], [story_id], 0
+        if story is None:
+            return [], [], 1
+        crawler = CommentTreeCrawler(self.client, story_id, max_depth=self.max_depth, batch_size=batch_size)
+        comments = list(crawler)
+        if crawler.stats.failed_ids:
+            logger.warning(
+                f"{len(crawler.stats.failed_ids)} comments of story {story_id} failed and were skipped "
+                f"with their replies"
+            )
+        return [story] + comments, crawler.stats.failed_ids, crawler.stats.missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=(TOP, RANGE))
+    parser.add_argument("--output", help="defaults to <export.directory>/<mode>.jsonl.gz")
+    parser.add_argument("--url", help="API URL, defaults to the `url` setting")
+    parser.add_argument("--start", type=int, default=1, help="first item ID (range)")
+    parser.add_argument("--end", type=int, help="last item ID (range), defaults to maxitem")
+    parser.add_argument("--limit", type=int, help="number of top stories (top)")
+    parser.add_argument("--max-depth", type=int, help="comment levels below each story (top)")
+    parser.add_argument("--concurrency", type=int, default=settings.export.concurrency)
+    parser.add_argument("--chunk-size", type=int, default=settings.export.chunk_size)
+    parser.add_argument("--max-chunks", type=int, help="stop after this many chunks, resume later")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(settings.export.directory, f"{args.mode}.jsonl.gz")
+    with HackerNewsClient(args.url, pool_maxsize=args.concurrency) as client:
+        exporter = Exporter(
+            client,
+            args.mode,
+            output,
+            start=args.start,
+            end=args.end,
+            limit=args.limit,
+            max_depth=args.max_depth,
+            concurrency=args.concurrency,
+            chunk_size=args.chunk_size,
+            restart=args.restart,
+        )
+        stats = exporter.run(max_chunks=args.max_chunks)
+    print(f"{stats}, output {exporter.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+from typing import Iterable, Iterator
+
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+
+class CrawlStats:
+    """Counters of a `CommentTreeCrawler` run"""
+
+    def __init__(self):
+        self.fetched = 0
+        self.yielded = 0
+        self.duplicates = 0
+        self.missing = 0
+        self.errors = 0
+        self.depth = 0
+        self.failed_ids = []  # IDs whose fetch failed, their replies are not crawled
+
+    def __repr__(self):
+        return (
+            f"CrawlStats(fetched={self.fetched}, yielded={self.yielded}, "
+            f"duplicates={self.duplicates}, missing={self.missing}, "
+            f"errors={self.errors}, depth={self.depth})"
+        )
+
+
+class CommentTreeCrawler:
+    """
+    Breadth-first crawler of the discussion below an item.
+
+    Every level of `kids` is fetched in batches of `batch_size` IDs through
+    `client.get_items`, so at most one batch of items is held at a time and
+    the rest of the crawl is kept as IDs only. Items are yielded level by
+    level in `kids` order.
+
+    Args:
+        client: HackerNewsClient instance to fetch items
+        root_id: Story (or comment) whose replies are crawled, not yielded itself
+        max_depth: Levels to expand below the root, None for the whole tree
+        max_items: Stop after yielding this many items
+        item_types: Only yield items of these types (all types are expanded)
+        batch_size: IDs fetched concurrently per batch, defaults to the pool maxsize
+        records: Yield compact `Item` records instead of dicts, for crawls
+            that are kept in memory
+
+    Failed fetches and `null` items are skipped and counted in `stats`, the
+    IDs that failed are kept in `stats.failed_ids`.
+    """
+
+    def __init__(
+        self,
+        client,
+        root_id: int,
+        max_depth: int = None,
+        max_items: int = None,
+        item_types: Iterable[str] = None,
+        batch_size: int = None,
+        records: bool = False,
+    ):
+        self.client = client
+        self.root_id = root_id
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.item_types = set(item_types) if item_types else None
+        self.batch_size = batch_size or client.pool_maxsize
+        self.records = records
+        self.stats = CrawlStats()
+
+    def __iter__(self) -> Iterator[dict]:
+        root = self.client.get_item(self.root_id).json()
+        if root is None:
+            logger.warning(f"Item {self.root_id} to crawl does not exist")
+            return
+        seen = {self.root_id}
+        level_ids = self._unseen(root.get('kids', []), seen)
+        depth = 1
+        while level_ids and (self.max_depth is None or depth <= self.max_depth):
+            self.stats.depth = depth
+            next_level_ids = []
+            for start in range(0, len(level_ids), self.batch_size):
+                batch = level_ids[start:start + self.batch_size]
+                for result in self.client.get_items(batch, max_concurrency=self.batch_size):
+                    item = self._item(result)
+                    if item is None:
+                        continue
+                    next_level_ids.extend(self._unseen(item.get('kids', []), seen))
+                    if self.item_types is None or item.get('type') in self.item_types:
+                        self.stats.yielded += 1
+                        yield item
+                        if self.max_items is not None and self.stats.yielded >= self.max_items:
+                            logger.info(f"Crawl of {self.root_id} stopped at max items: {self.stats}")
+                            return
+            level_ids = next_level_ids
+            depth += 1
+        logger.info(f"Crawl of {self.root_id} finished: {self.stats}")
+
+    def _item(self, result):
+        self.stats.fetched += 1
+        if not result.ok:
+            self.stats.errors += 1
+            self.stats.failed_ids.append(result.item_id)
+            return None
+        item = result.item() if self.records else result.json()
+        if item is None:
+            self.stats.missing += 1
+        return item
+
+    def _unseen(self, kids, seen):
+        unseen = []
+        for kid in kids:
+            if kid in seen:
+                self.stats.duplicates += 1
+                continue
+            seen.add(kid)
+            unseen.append(kid)
+        return unseen
@@ -0,0 +1,147 @@
+"""
+Declarative Hacker News item schemas compiled into fast validators.
+
+Based on the official Hacker News API specification:
+https://github.com/HackerNews/API#items
+"""
+from typing import Callable, Iterable, List
+
+# Type of every item field in the API spec, [type] is a list of that type
+FIELD_TYPES = {
+    'id': int,
+    'deleted': bool,
+    'type': str,
+    'by': str,
+    'time': int,
+    'text': str,
+    'dead': bool,
+    'parent': int,
+    'poll': int,
+    'kids': [int],
+    'url': str,
+    'score': int,
+    'title': str,
+    'parts': [int],
+    'descendants': int,
+}
+
+REQUIRED_FIELDS = ('id', 'type', 'time')
+COMMON_FIELDS = ('deleted', 'dead', 'by')
+MAX_REPORTED_VIOLATIONS = 50
+_MISSING = object()
+
+
+class ItemSchema:
+    """Required and optional fields of one item type, see `compile()`"""
+
+    def __init__(self, item_type: str, optional: Iterable[str]):
+        self.item_type = item_type
+        self.required = REQUIRED_FIELDS
+        self.optional = tuple(COMMON_FIELDS) + tuple(optional)
+
+    def compile(self, strict: bool = False) -> Callable[[dict], List[str]]:
+        """
+        Build a validator returning the violations of one item (empty if valid).
+
+        Every field of the spec is type-checked when present, including every
+        element of list fields. Fields of other item types are reported only
+        when `strict` is set.
+        """
+        checks = []
+        for field, expected in FIELD_TYPES.items():
+            element = expected[0] if isinstance(expected, list) else None
+            checks.append((field, list if element else expected, element, field in self.required))
+        checks = tuple(checks)
+        allowed = frozenset(self.required + self.optional)
+        item_type = self.item_type
+
+        def validate(item):
+            violations = []
+            for field, expected, element, required in checks:
+                value = item.get(field, _MISSING)
+                if value is _MISSING:
+                    if required:
+                        violations.append(f"Missing required field '{field}'")
+                    continue
+                if type(value) is not expected:
+                    violations.append(
+                        f"Field '{field}' must be {expected.__name__}, got {type(value).__name__}"
+                    )
+                    continue
+                if element is not None:
+                    for entry in value:
+                        if type(entry) is not element:
+                            violations.append(
+                                f"Field '{field}' item must be {element.__name__}, "
+                                f"got {type(entry).__name__} ({entry})"
+                            )
+            if strict:
+                for field in item.keys() - allowed:
+                    violations.append(f"Unexpected field '{field}' for type '{item_type}'")
+            return violations
+
+        return validate
+
+
+ITEM_SCHEMAS = {
+    schema.item_type: schema
+    for schema in (
+        ItemSchema('story', ('title', 'url', 'text', 'score', 'descendants', 'kids')),
+        ItemSchema('comment', ('text', 'parent', 'kids')),
+        ItemSchema('job', ('title', 'url', 'text', 'score')),
+        ItemSchema('poll', ('title', 'text', 'score', 'descendants', 'kids', 'parts')),
+        ItemSchema('pollopt', ('text', 'poll', 'score')),
+    )
+}
+
+_VALIDATORS = {
+    strict: {item_type: schema.compile(strict) for item_type, schema in ITEM_SCHEMAS.items()}
+    for strict in (False, True)
+}
+
+
+def validate_items(items: Iterable[dict], item_type: str = None, strict: bool = False) -> List[str]:
+    """
+    Validate a batch of items against their type's schema.
+
+    Args:
+        items: Item dicts, e.g. decoded `get_item` responses
+        item_type: Expected type of every item, None to accept any known type
+        strict: Also report fields that do not belong to the item type
+
+    Returns:
+        list: All violations, each prefixed with the item id
+    """
+    validators = _VALIDATORS[strict]
+    violations = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            violations.append(f"item #{index}: must be dict, got {type(item).__name__}")
+            continue
+        label = f"item {item.get('id', f'#{index}')}"
+        actual_type = item.get('type')
+        if item_type is not None and actual_type != item_type:
+            violations.append(f"{label}: Expected type '{item_type}', got '{actual_type}'")
+            continue
+        validator = validators.get(actual_type)
+        if validator is None:
+            if 'type' not in item:
+                violations.append(f"{label}: Missing required field 'type'")
+            else:
+                violations.append(f"{label}: Unknown item type '{actual_type}'")
+            continue
+        for violation in validator(item):
+            violations.append(f"{label}: {violation}")
+    return violations
+
+
+def assert_items_valid(items: Iterable[dict], item_type: str = None, strict: bool = False):
+    """Assert a batch of items is valid, reporting all violations together"""
+    violations = validate_items(items, item_type, strict)
+    if violations:
+        shown = "\n".join(violations[:MAX_REPORTED_VIOLATIONS])
+        more = len(violations) - MAX_REPORTED_VIOLATIONS
+        raise AssertionError(
+            f"{len(violations)} item schema violations:\n{shown}"
+            + (f"\n... and {more} more" if more > 0 else "")
+        )
@@ -0,0 +1,129 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+
+class SearchStats:
+    """Fetch accounting of a `find_first_item` search
+
+    needed:    fetches a sequential scan would have made (answer position + 1,
+               or every ID when nothing matched)
+    issued:    fetches actually sent
+    cancelled: speculative fetches cancelled before they were sent
+    wasted:    speculative fetches sent past the answer (issued - needed)
+    saved:     fetches avoided compared to fetching every ID (total - issued)
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.needed = 0
+        self.issued = 0
+        self.cancelled = 0
+
+    @property
+    def wasted(self):
+        return max(self.issued - self.needed, 0)
+
+    @property
+    def saved(self):
+        return self.total - self.issued
+
+    def __repr__(self):
+        return (
+            f"SearchStats(total={self.total}, needed={self.needed}, issued={self.issued}, "
+            f"cancelled={self.cancelled}, wasted={self.wasted}, saved={self.saved})"
+        )
+
+
+class SearchResult:
+    """First item matching a `find_first_item` predicate, `item` is None if no match"""
+
+    def __init__(self, item_id, item, stats: SearchStats):
+        self.item_id = item_id
+        self.item = item
+        self.stats = stats
+
+    @property
+    def found(self):
+        return self.item is not None
+
+
+def find_first_item(
+    client, item_ids: list, predicate: Callable[[dict], bool], window: int = None
+) -> SearchResult:
+    """
+    Find the first item in `item_ids` order that matches `predicate`.
+
+    Up to `window` items ahead of the first unresolved position are fetched
+    speculatively and the predicate is evaluated as each one arrives. Once
+    every item before the earliest match has been resolved, the answer is
+    known and outstanding fetches are cancelled; fetches already running are
+    not waited for. Missing (`null`) items never
+    match. A fetch error is re-raised only once every item before it has been
+    resolved without a match, i.e. when a sequential scan would have hit it;
+    errors of speculative fetches past the answer are ignored.
+
+    Args:
+        client: HackerNewsClient instance to fetch items
+        item_ids: Item IDs in priority order
+        predicate: Called with each fetched item dict
+        window: Max in-flight fetches, defaults to the client pool maxsize
+
+    Returns:
+        SearchResult: the matching item and fetch statistics
+    """
+    item_ids = list(item_ids)
+    window = window or client.pool_maxsize
+    stats = SearchStats(len(item_ids))
+    in_flight = {}  # future -> position in item_ids
+    resolved = set()  # positions fetched without a match
+    errors = {}  # position -> fetch error, raised once the cursor gets there
+    match_index, match_item = None, None
+    cursor = next_index = 0  # first unresolved / next unsubmitted position
+
+    executor = ThreadPoolExecutor(max_workers=max(min(window, len(item_ids)), 1))
+    try:
+        while True:
+            limit = len(item_ids) if match_index is None else match_index
+            while next_index < min(cursor + window, limit):
+                future = executor.submit(client.get_item, item_ids[next_index])
+                in_flight[future] = next_index
+                next_index += 1
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                try:
+                    item = future.result().json()
+                except Exception as e:
+                    errors[index] = e
+                    continue
+                if item is not None and predicate(item):
+                    if match_index is None or index < match_index:
+                        match_index, match_item = index, item
+                else:
+                    resolved.add(index)
+
+            while cursor in resolved:
+                cursor += 1
+            if match_index is not None and cursor >= match_index:
+                break
+            if cursor in errors:  # no earlier match, a sequential scan fails here too
+                raise errors[cursor]
+    finally:
+        for future in in_flight:
+            if future.cancel():
+                stats.cancelled += 1
+        stats.issued = next_index - stats.cancelled
+        executor.shutdown(wait=False, cancel_futures=True)  # running fetches finish in the background
+
+    stats.needed = len(item_ids) if match_index is None else match_index + 1
+    logger.info(f"Search finished: {stats}")
+    if match_index is None:
+        return SearchResult(None, None, stats)
+    return SearchResult(item_ids[match_index], match_item, stats)
@@ -0,0 +1,107 @@
+from typing import Dict, Iterable, List
+
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+
+class ItemStoreStats:
+    """Counters of an `ItemStore`"""
+
+    def __init__(self):
+        self.hits = 0
+        self.fetched = 0
+        self.refreshed = 0
+        self.errors = 0
+        self.syncs = 0
+
+    def __repr__(self):
+        return (
+            f"ItemStoreStats(hits={self.hits}, fetched={self.fetched}, "
+            f"refreshed={self.refreshed}, errors={self.errors}, syncs={self.syncs})"
+        )
+
+
+class ItemStore:
+    """
+    Local copy of items kept current through the `updates` endpoint.
+
+    Items are fetched once and then served locally. `sync()` asks the API which
+    items changed and re-fetches only the stored ones among them, so a
+    monitoring cycle costs a couple of requests plus one per changed item
+    instead of a full re-crawl. `max_item` is refreshed on every sync and
+    `new_item_ids()` lists the items created since the previous one.
+
+    Args:
+        client: HackerNewsClient instance to fetch items
+        records: Store compact `Item` records instead of dicts
+        max_concurrency: Max in-flight requests of batch fetches
+    """
+
+    def __init__(self, client, records: bool = False, max_concurrency: int = None):
+        self.client = client
+        self.records = records
+        self.max_concurrency = max_concurrency
+        self.max_item = None
+        self.previous_max_item = None
+        self.stats = ItemStoreStats()
+        self._items = {}  # id -> item, None for items that do not exist
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item_id):
+        return item_id in self._items
+
+    def get(self, item_id: int):
+        """Stored item, fetched on first access; None if it does not exist"""
+        if item_id in self._items:
+            self.stats.hits += 1
+            return self._items[item_id]
+        return self.get_many([item_id]).get(item_id)
+
+    def get_many(self, item_ids: Iterable[int]) -> Dict:
+        """Items by ID, fetching the ones not stored yet in one batch;
+        failed fetches are left out"""
+        item_ids = list(dict.fromkeys(item_ids))
+        missing = [item_id for item_id in item_ids if item_id not in self._items]
+        self.stats.hits += len(item_ids) - len(missing)
+        self.stats.fetched += len(self._fetch(missing))
+        return {item_id: self._items[item_id] for item_id in item_ids if item_id in self._items}
+
+    def sync(self) -> List[int]:
+        """
+        Re-fetch stored items listed by the `updates` endpoint and refresh
+        `max_item`.
+
+        Returns:
+            list: IDs of the stored items that were re-fetched
+        """
+        updated = self.client.get_updates().json() or {}
+        changed = [item_id for item_id in updated.get("items", []) if item_id in self._items]
+        refreshed = self._fetch(changed)
+        self.stats.refreshed += len(refreshed)
+        self.stats.syncs += 1
+        self.previous_max_item = self.max_item
+        self.max_item = self.client.get_max_item().json()
+        logger.info(f"Item store synced, {len(refreshed)} of {len(self._items)} items changed: {self.stats}")
+        return refreshed
+
+    def new_item_ids(self) -> range:
+        """IDs created between the last two syncs, empty before the second one"""
+        if self.previous_max_item is None or self.max_item is None:
+            return range(0)
+        return range(self.previous_max_item + 1, self.max_item + 1)
+
+    def _fetch(self, item_ids) -> List[int]:
+        """Fetch and store items, returns the IDs fetched successfully"""
+        if not item_ids:
+            return []
+        fetched = []
+        for result in self.client.get_items(item_ids, max_concurrency=self.max_concurrency):
+            if not result.ok:
+                self.stats.errors += 1
+                continue
+            self._items[result.item_id] = result.item() if self.records else result.json()
+            fetched.append(result.item_id)
+        return fetched
@@ -0,0 +1,68 @@
+import sys
+from array import array
+
+from core.api.helpers.item_schema import FIELD_TYPES
+
+LIST_FIELDS = tuple(field for field, expected in FIELD_TYPES.items() if isinstance(expected, list))
+INTERNED_FIELDS = ('type', 'by')  # few distinct values repeated across items
+
+
+class Item:
+    """
+    Compact typed record of a Hacker News item.
+
+    One slot per field of the API spec (None when absent) and `kids`/`parts`
+    stored as `array('l')` instead of lists of Python ints; `type` and `by`
+    strings are interned, a fraction of the memory of the decoded dict. Supports the read-only dict access the helpers
+    use (`item['id']`, `item.get('kids')`, `'kids' in item`); `to_dict()`
+    converts back for schema validation or JSON output.
+    """
+
+    __slots__ = tuple(FIELD_TYPES)
+
+    def __init__(self, **fields):
+        for field in self.__slots__:
+            value = fields.get(field)
+            if value is not None:
+                if field in LIST_FIELDS:
+                    value = array('l', value)
+                elif field in INTERNED_FIELDS:
+                    value = sys.intern(value)
+            setattr(self, field, value)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Item from a decoded API response, None for `null` (or empty) items"""
+        if not data:
+            return None
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        """Fields that are set, with list fields as lists like the API returns"""
+        data = {}
+        for field in self.__slots__:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value.tolist() if field in LIST_FIELDS else value
+        return data
+
+    def get(self, field, default=None):
+        value = getattr(self, field, None) if field in FIELD_TYPES else None
+        return default if value is None else value
+
+    def __getitem__(self, field):
+        value = self.get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field):
+        return self.get(field) is not None
+
+    def __eq__(self, other):
+        if not isinstance(other, Item):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return f"Item(id={self.id}, type={self.type!r})"
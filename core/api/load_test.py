@@ -0,0 +1,249 @@
+"""
+Soak / load test of `HackerNewsClient` with SLO checks.
+
+Sends a weighted mix of `topstories` and `item` requests for a fixed
+duration, either closed loop (`concurrency` workers sending back to back) or
+open loop at a target `rate` of requests per second. Open loop latencies are
+measured from the scheduled send time, so requests queued behind slow ones
+count as slow too. Item IDs are drawn from the top stories.
+
+The run fails (exit code 1) when the overall p95/p99 latency or the error
+rate breaks the SLOs of the `load_test` section of settings.yaml.
+
+Usage:
+    python -m core.api.load_test --duration 60 --concurrency 20
+    python -m core.api.load_test --duration 300 --rate 50 --mix topstories=1,item=20
+    python -m core.api.load_test --stub --duration 10  # against a local stub server
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ROOT_DIR, settings
+from core.api.clients.hackernews_client import HackerNewsClient
+from core.api.metrics import summarize_timings
+from core.api.stub_server import HackerNewsStubServer
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+REQUEST_TYPES = ("topstories", "item")
+
+
+class LoadTestResult:
+    """Latencies and errors per request type of a `LoadTest` run"""
+
+    def __init__(self):
+        self.latencies = {}  # request type -> array of seconds
+        self.errors = {}  # request type -> failed requests
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, request_type, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(request_type, array("d")).append(seconds)
+            self.errors.setdefault(request_type, 0)
+            if not ok:
+                self.errors[request_type] += 1
+
+    @property
+    def requests(self):
+        return sum(len(samples) for samples in self.latencies.values())
+
+    @property
+    def error_rate(self):
+        return sum(self.errors.values()) / self.requests if self.requests else 0.0
+
+    def summary(self):
+        """Request count, throughput, error rate and latency percentiles,
+        overall and per request type"""
+        overall = [seconds for samples in self.latencies.values() for seconds in samples]
+        return {
+            "duration": self.duration,
+            "requests": self.requests,
+            "throughput": self.requests / self.duration if self.duration else 0.0,
+            "error_rate": self.error_rate,
+            "latency": summarize_timings(overall) if overall else None,
+            "types": {
+                request_type: {
+                    "requests": len(samples),
+                    "errors": self.errors[request_type],
+                    "latency": summarize_timings(samples),
+                }
+                for request_type, samples in self.latencies.items()
+            },
+        }
+
+    def violations(self, slo):
+        """SLOs (`p95`, `p99` in seconds, `error_rate`) broken by this run"""
+        if not self.requests:
+            return ["no requests were sent"]
+        summary = self.summary()
+        broken = [
+            f"{name} latency {summary['latency'][name] * 1000:.1f}ms > {slo[name] * 1000:.1f}ms"
+            for name in ("p95", "p99")
+            if summary["latency"][name] > slo[name]
+        ]
+        if self.error_rate > slo["error_rate"]:
+            broken.append(f"error rate {self.error_rate:.2%} > {slo['error_rate']:.2%}")
+        return broken
+
+
+class LoadTest:
+    """
+    Drives a client with a weighted request mix.
+
+    Args:
+        client: HackerNewsClient instance under test
+        duration: Seconds to send requests for
+        mix: Relative weight per request type, e.g. {"topstories": 1, "item": 9}
+        rate: Target requests per second (open loop), 0 for closed loop
+        concurrency: Worker threads, i.e. max in-flight requests
+        seed: Seed of the request type and item ID choices
+    """
+
+    def __init__(
+        self,
+        client,
+        duration: float = None,
+        mix: dict = None,
+        rate: float = None,
+        concurrency: int = None,
+        seed: int = None,
+    ):
+        self.client = client
+        self.duration = duration or settings.load_test.duration
+        self.mix = dict(mix or settings.load_test.mix)
+        unknown = self.mix.keys() - set(REQUEST_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown request types {sorted(unknown)}, expected {', '.join(REQUEST_TYPES)}")
+        self.rate = settings.load_test.rate if rate is None else rate
+        self.concurrency = concurrency or settings.load_test.concurrency
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.item_ids = []
+
+    def run(self) -> LoadTestResult:
+        self.item_ids = self.client.get_top_stories().json() or [1]
+        result = LoadTestResult()
+        mode = f"{self.rate} req/s" if self.rate else f"{self.concurrency} workers"
+        logger.info(f"Load test for {self.duration}s at {mode}, mix {self.mix}")
+        # identical concurrent requests would share one network call but be recorded each
+        single_flight, self.client.single_flight = self.client.single_flight, None
+        start = time.perf_counter()
+        try:
+            if self.rate:
+                self._open_loop(result, start)
+            else:
+                self._closed_loop(result, start)
+        finally:
+            self.client.single_flight = single_flight
+        result.duration = time.perf_counter() - start
+        return result
+
+    def _closed_loop(self, result, start):
+        deadline = start + self.duration
+
+        def worker():
+            while time.perf_counter() < deadline:
+                self._send(result, time.perf_counter())
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for _ in range(self.concurrency):
+                executor.submit(worker)
+
+    def _open_loop(self, result, start):
+        interval = 1 / self.rate
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for index in range(int(self.duration * self.rate)):
+                scheduled = start + index * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._send, result, scheduled)
+
+    def _send(self, result, scheduled):
+        with self._random_lock:
+            request_type = self._random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+            item_id = self._random.choice(self.item_ids)
+        try:
+            if request_type == "topstories":
+                self.client.get_top_stories().json()
+            else:
+                self.client.get_item(item_id).json()
+            ok = True
+        except Exception as e:
+            logger.warning(f"Load test {request_type} request failed: {e}")
+            ok = False
+        result.record(request_type, time.perf_counter() - scheduled, ok)
+
+
+def save_report(result: LoadTestResult, slo, violations, path):
+    path = path if os.path.isabs(path) else os.path.join(ROOT_DIR, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                **result.summary(),
+                "slo": dict(slo),
+                "violations": violations,
+            },
+            f,
+            indent=4,
+            sort_keys=True,
+        )
+    logger.info(f"Saved load test report to {path}")
+
+
+def _parse_mix(value):
+    """`topstories=1,item=9` -> {"topstories": 1.0, "item": 9.0}"""
+    return {name: float(weight) for name, weight in (pair.split("=") for pair in value.split(","))}
+
+
+def main():
+    options = settings.load_test
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="API URL, defaults to the `url` setting")
+    parser.add_argument("--stub", action="store_true", help="start a local stub server and test against it")
+    parser.add_argument("--duration", type=float, default=options.duration, help="seconds")
+    parser.add_argument("--rate", type=float, default=options.rate, help="target req/s, 0 for closed loop")
+    parser.add_argument("--concurrency", type=int, default=options.concurrency)
+    parser.add_argument("--mix", type=_parse_mix, help="weights, e.g. topstories=1,item=9")
+    parser.add_argument("--report", default=options.report)
+    args = parser.parse_args()
+
+    settings.set("detailed_logs", False)  # measure the client, not request tracing
+    stub = HackerNewsStubServer.from_settings().start() if args.stub else None
+    url = stub.url if stub is not None else args.url
+    try:
+        with HackerNewsClient(url, pool_maxsize=args.concurrency) as client:
+            load_test = LoadTest(client, args.duration, args.mix, args.rate, args.concurrency)
+            result = load_test.run()
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    violations = result.violations(options.slo)
+    save_report(result, options.slo, violations, args.report)
+    summary = result.summary()
+    if summary["latency"]:
+        latency = summary["latency"]
+        print(
+            f"{summary['requests']} requests in {summary['duration']:.1f}s ({summary['throughput']:.1f} req/s), "
+            f"errors {summary['error_rate']:.2%}, p50={latency['p50'] * 1000:.1f}ms "
+            f"p95={latency['p95'] * 1000:.1f}ms p99={latency['p99'] * 1000:.1f}ms"
+        )
+    for violation in violations:
+        print(f"SLO breached: {violation}")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from config import ROOT_DIR, settings
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|\.json$|$)")
+COUNTERS = ("requests", "retries", "errors", "bytes")
+
+
+def endpoint_name(url):
+    """Path of `url` with numeric IDs replaced, e.g. `/v0/item/{id}.json`"""
+    return NUMERIC_SEGMENT.sub("/{id}", urlparse(url).path)
+
+
+def percentile(sorted_samples, percent):
+    """Nearest-rank percentile of already sorted samples"""
+    index = max(int(round(percent / 100 * len(sorted_samples) + 0.5)) - 1, 0)
+    return sorted_samples[min(index, len(sorted_samples) - 1)]
+
+
+def summarize_timings(samples):
+    """Count, mean, min, max and p50/p95/p99 of durations in seconds"""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+    }
+
+
+class Histogram:
+    """
+    Durations counted in fixed log-spaced buckets, memory does not grow with
+    the number of samples.
+
+    Buckets span `MIN_SECONDS` to `MAX_SECONDS` with `BUCKETS_PER_DECADE` per
+    factor of 10, so a percentile is off by at most half a bucket (about 6%);
+    count, mean, min and max are exact.
+    """
+
+    MIN_SECONDS = 1e-6
+    MAX_SECONDS = 1e3
+    BUCKETS_PER_DECADE = 20
+    BUCKETS = int(math.log10(MAX_SECONDS / MIN_SECONDS) * BUCKETS_PER_DECADE)
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, seconds):
+        if seconds > self.MIN_SECONDS:
+            index = min(int(math.log10(seconds / self.MIN_SECONDS) * self.BUCKETS_PER_DECADE), self.BUCKETS - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def copy(self):
+        histogram = Histogram()
+        histogram.counts = list(self.counts)
+        histogram.count, histogram.total, histogram.min, histogram.max = self.count, self.total, self.min, self.max
+        return histogram
+
+    def percentile(self, percent):
+        """Nearest-rank percentile, the geometric middle of its bucket"""
+        rank = max(int(round(percent / 100 * self.count + 0.5)), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                middle = self.MIN_SECONDS * 10 ** ((index + 0.5) / self.BUCKETS_PER_DECADE)
+                return min(max(middle, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        """Same keys as `summarize_timings`"""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class RequestTrace:
+    """
+    Timestamps of the httpx `trace` extension events of one request.
+
+    Pass as `extensions={"trace": trace}` to a sync httpx client or
+    `{"trace": trace.atrace}` to an async one; `phases()` turns the events
+    into connect (DNS + TCP), TLS, time to first byte and transfer durations.
+    Connect and TLS are only present when the request opened a connection.
+    """
+
+    def __init__(self):
+        self.events = {}
+
+    def __call__(self, name, info):
+        # "http11.send_request_headers.started" -> "send_request_headers.started"
+        self.events[name.split(".", 1)[1]] = time.perf_counter()
+
+    async def atrace(self, name, info):
+        self(name, info)
+
+    def _duration(self, start, end):
+        if start in self.events and end in self.events:
+            return self.events[end] - self.events[start]
+        return None
+
+    def phases(self):
+        durations = {
+            "connect": self._duration("connect_tcp.started", "connect_tcp.complete"),
+            "tls": self._duration("start_tls.started", "start_tls.complete"),
+            "ttfb": self._duration("send_request_headers.started", "receive_response_headers.complete"),
+            "transfer": self._duration("receive_response_body.started", "receive_response_body.complete"),
+        }
+        return {phase: seconds for phase, seconds in durations.items() if seconds is not None}
+
+
+class ClientMetrics:
+    """
+    Per-endpoint latency histograms and counters of every client in the process.
+
+    Timing phases, in seconds:
+        send:      whole `send()` call as seen by the caller, including rate
+                   limiting, retries, coalescing and logging
+        connect:   DNS lookup and TCP connect of new connections (httpx based
+                   clients and transports)
+        tls:       TLS handshake of new connections (httpx based)
+        ttfb:      request sent until response headers received; includes
+                   connecting for the `requests` transport, which does not split it
+        transfer:  reading the response body
+        decode:    JSON decoding in `ApiResponse.json()`
+
+    Counters: requests sent (retries included), retries, errors and response
+    body bytes. Timings are kept in a `Histogram` per endpoint and phase, so
+    long runs hold a fixed amount of memory.
+    """
+
+    def __init__(self):
+        self._timings = {}  # endpoint -> phase -> Histogram
+        self._counters = {}  # endpoint -> counter -> value
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, phase, seconds):
+        with self._lock:
+            phases = self._timings.setdefault(endpoint, {})
+            if phase not in phases:
+                phases[phase] = Histogram()
+            phases[phase].add(seconds)
+
+    def count(self, endpoint, counter, value=1):
+        with self._lock:
+            counters = self._counters.setdefault(endpoint, dict.fromkeys(COUNTERS, 0))
+            counters[counter] += value
+
+    def record_response(self, endpoint, response, seconds, trace: RequestTrace = None):
+        """Record one network response, `seconds` being the wall time of the request"""
+        if trace is not None and trace.events:
+            phases = trace.phases()
+        else:  # requests: elapsed stops once headers are parsed, the body is read after
+            ttfb = response.elapsed.total_seconds()
+            phases = {"ttfb": ttfb, "transfer": max(seconds - ttfb, 0.0)}
+        for phase, duration in phases.items():
+            self.observe(endpoint, phase, duration)
+        self.count(endpoint, "requests")
+        self.count(endpoint, "bytes", len(response.content))
+
+    def decode_observer(self, endpoint):
+        """Callback for `ApiResponse(on_decode=...)`"""
+        return lambda seconds: self.observe(endpoint, "decode", seconds)
+
+    @property
+    def endpoints(self):
+        return sorted(self._timings.keys() | self._counters.keys())
+
+    def summary(self):
+        """Counters and timing percentiles per endpoint"""
+        with self._lock:
+            timings = {endpoint: {phase: histogram.copy() for phase, histogram in phases.items()}
+                       for endpoint, phases in self._timings.items()}
+            counters = {endpoint: dict(values) for endpoint, values in self._counters.items()}
+        return {
+            endpoint: {
+                **counters.get(endpoint, dict.fromkeys(COUNTERS, 0)),
+                "timings": {phase: histogram.summary()
+                            for phase, histogram in timings.get(endpoint, {}).items()},
+            }
+            for endpoint in self.endpoints
+        }
+
+    def save(self, path):
+        """Write `summary()` as JSON and log the send percentiles per endpoint"""
+        path = path if os.path.isabs(path) else os.path.join(ROOT_DIR, path)
+        summary = self.summary()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(
+                {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "endpoints": summary},
+                f,
+                indent=4,
+                sort_keys=True,
+            )
+        for endpoint, metrics in summary.items():
+            send = metrics["timings"].get("send")
+            if send:
+                logger.info(
+                    f"{endpoint}: {metrics['requests']} requests, {metrics['retries']} retries, "
+                    f"{metrics['errors']} errors, p50={send['p50'] * 1000:.1f}ms "
+                    f"p95={send['p95'] * 1000:.1f}ms p99={send['p99'] * 1000:.1f}ms"
+                )
+        logger.info(f"Saved client metrics of {len(summary)} endpoints to {path}")
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+
+
+_metrics = ClientMetrics()
+
+
+def get_metrics():
+    """Metrics shared by all clients of the process, None when disabled via
+    `metrics.enabled`"""
+    return _metrics if settings.metrics.enabled else None
@@ -0,0 +1,191 @@
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from config import settings
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+
+class RateLimiterStats:
+    """Counters of a `RateLimiter` and its `RetryBudget`"""
+
+    def __init__(self):
+        self.requests = 0
+        self.throttled_responses = 0
+        self.throttled_time = 0.0  # seconds requests waited for a token
+        self.retries = 0
+        self.retries_denied = 0
+
+    def __repr__(self):
+        return (
+            f"RateLimiterStats(requests={self.requests}, "
+            f"throttled_responses={self.throttled_responses}, "
+            f"throttled_time={self.throttled_time:.3f}s, retries={self.retries}, "
+            f"retries_denied={self.retries_denied})"
+        )
+
+
+class RetryBudget:
+    """
+    Retries shared by all in-flight requests of a limiter.
+
+    Every request adds `ratio` retry tokens (capped), every retry spends one.
+    `minimum` tokens are always available, so isolated failures are retried
+    while a server answering most requests with 429 even at the limiter's
+    `min_rate` does not get a retry storm.
+    """
+
+    def __init__(self, ratio=None, minimum=None):
+        self.ratio = settings.retry.budget_ratio if ratio is None else ratio
+        self.minimum = settings.retry.budget_min if minimum is None else minimum
+        self._tokens = float(self.minimum)
+        self._cap = max(self.minimum * 10, 1)
+
+    def deposit(self):
+        self._tokens = min(self._tokens + self.ratio, self._cap)
+
+    def withdraw(self):
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class RateLimiter:
+    """
+    Adaptive token bucket shared by every request to one host.
+
+    Requests take a token before they are sent, refilled at `rate` per second
+    up to `capacity`: `burst` at `max_rate`, shrinking with the rate so a
+    throttled limiter does not send bursts the server rejects. The rate
+    follows AIMD: successful responses raise it by about `increase` req/s per
+    second (up to `max_rate`), each throttled response multiplies it by
+    `decrease` (down to `min_rate`, at most once per `cooldown` seconds so a
+    burst of 429s answering concurrent requests counts once) and a
+    `Retry-After` pauses every request until it passes.
+    Thread-safe, `acquire_async` is the asyncio variant.
+    """
+
+    def __init__(
+        self,
+        max_rate: float = None,
+        min_rate: float = None,
+        burst: int = None,
+        increase: float = None,
+        decrease: float = None,
+        cooldown: float = None,
+        budget: RetryBudget = None,
+        clock=time.monotonic,
+    ):
+        options = settings.rate_limit
+        self.max_rate = max_rate or options.max_rate
+        self.min_rate = min_rate or options.min_rate
+        self.burst = burst or options.burst
+        self.increase = options.increase if increase is None else increase
+        self.decrease = decrease or options.decrease
+        self.cooldown = options.cooldown if cooldown is None else cooldown
+        self.rate = self.max_rate
+        self.budget = budget or RetryBudget()
+        self.stats = RateLimiterStats()
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._decreased_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        """Tokens the bucket holds at the current rate, at least one"""
+        return max(self.burst * self.rate / self.max_rate, 1.0)
+
+    def _reserve(self):
+        """Take a token, returns how long the caller has to wait for it"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            self.stats.requests += 1
+            self.budget.deposit()
+            wait = max(self._paused_until - now, -self._tokens / self.rate, 0.0)
+            self.stats.throttled_time += wait
+            return wait
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.rate + self.increase / self.rate, self.max_rate)
+
+    def on_throttled(self, retry_after: float = None):
+        with self._lock:
+            now = self._clock()
+            self.stats.throttled_responses += 1
+            if self._decreased_at is None or now - self._decreased_at >= self.cooldown:
+                self.rate = max(self.rate * self.decrease, self.min_rate)
+                self._tokens = min(self._tokens, self.capacity)  # shrink the bucket with the rate
+                self._decreased_at = now
+                logger.warning(f"Throttled by server, rate lowered to {self.rate:.1f} req/s")
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+    def allow_retry(self):
+        """Whether a throttled request may be retried, spends from the shared
+        budget; False when it is exhausted"""
+        with self._lock:
+            allowed = self.budget.withdraw()
+            if allowed:
+                self.stats.retries += 1
+            else:
+                self.stats.retries_denied += 1
+            return allowed
+
+
+def backoff_delay(attempt: int, retry_after: float = None):
+    """
+    Delay before retry `attempt + 1`: full jitter over `backoff_factor * 2 **
+    attempt` capped at `max_backoff`, at least the server's `Retry-After`
+    (a `Retry-After: 0` does not make a throttled request retry at once).
+    """
+    ceiling = min(settings.retry.backoff_factor * (2 ** attempt), settings.retry.max_backoff)
+    return max(retry_after or 0.0, random.uniform(0, ceiling))
+
+
+def parse_retry_after(response):
+    """`Retry-After` header in seconds, None when absent or not a number"""
+    value = response.headers.get("Retry-After")
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form is not used by the API
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(url):
+    """Limiter shared by all clients of the process for the host of `url`,
+    None when disabled via `rate_limit.enabled`"""
+    if not settings.rate_limit.enabled:
+        return None
+    host = urlparse(url).netloc
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter()
+        return _limiters[host]
@@ -0,0 +1,180 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import ROOT_DIR, settings
+from core.api.api_response import ApiResponse
+from core.api.cache import CacheStats, ResponseCache
+from core.api.cassette import build_response, response_meta
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    expires_at REAL,
+    meta TEXT NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    worker TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL,
+    shared_hits INTEGER NOT NULL,
+    misses INTEGER NOT NULL,
+    writes INTEGER NOT NULL
+);
+"""
+
+
+class SharedCacheStats(CacheStats):
+    """`CacheStats` plus hits served by other processes and responses stored"""
+
+    def __init__(self):
+        super().__init__()
+        self.shared_hits = 0
+        self.writes = 0
+
+    def __repr__(self):
+        return (
+            f"SharedCacheStats(hits={self.hits}, shared_hits={self.shared_hits}, "
+            f"misses={self.misses}, hit_rate={self.hit_rate:.1%}, writes={self.writes})"
+        )
+
+
+def _serialize(response: ApiResponse):
+    """`response_meta()` JSON and body of a response, also after `release()`"""
+    if response.response is not None:
+        return response_meta(response.response), response.response.content
+    meta = {
+        "status": response.status_code(),
+        "reason": "",
+        "headers": dict(response.headers()),
+        "elapsed": response.response_time.total_seconds(),
+    }
+    return json.dumps(meta, separators=(",", ":")), response.body()
+
+
+class SharedResponseCache(ResponseCache):
+    """
+    `ResponseCache` backed by an SQLite database shared between processes.
+
+    Lookups missing the in-process LRU go to the database, so a response
+    fetched by one pytest-xdist worker is served to all the others. The
+    database runs in WAL mode: readers never block each other or the single
+    writer, and concurrent writers wait up to `busy_timeout` seconds. Expiry
+    times are stored as wall-clock time so every process agrees on them.
+    """
+
+    def __init__(self, path=None, max_entries: int = None, ttl: dict = None, busy_timeout: float = 30):
+        super().__init__(max_entries, ttl)
+        self.path = database_path(path)
+        self.stats = SharedCacheStats()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=busy_timeout, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent, fsync on checkpoint only
+        self._db.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+
+    @staticmethod
+    def db_key(key):
+        return "/".join(str(part) for part in key if part is not None)
+
+    def get(self, key) -> ApiResponse:
+        with self._lock:
+            response = self._lookup(key)
+            if response is not None:
+                self.stats.hits += 1
+                return response
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT expires_at, meta, body FROM responses WHERE key = ?", (self.db_key(key),)
+            ).fetchone()
+        now = time.time()
+        if row is None or (row[0] is not None and row[0] <= now):
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        expires_at, meta, body = row
+        response = build_response(None, meta, body)
+        response = ApiResponse(response, response.elapsed)
+        if settings.response.stream:
+            response.release()
+        self._put(key, None if expires_at is None else expires_at - now, response)
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.shared_hits += 1
+        return response
+
+    def set(self, key, response: ApiResponse):
+        ttl = self.ttl_for(key, response)
+        self._put(key, ttl, response)
+        expires_at = None if ttl is None else time.time() + ttl
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (self.db_key(key), expires_at, *_serialize(response)),
+            )
+        with self._lock:
+            self.stats.writes += 1
+
+    def discard(self, key):
+        super().discard(key)
+        with self._db_lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (self.db_key(key),))
+
+    def clear(self):
+        super().clear()
+        with self._db_lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def save_stats(self, worker: str):
+        """Store this process's counters for `aggregate_stats()`"""
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?)",
+                (worker, self.stats.hits, self.stats.shared_hits, self.stats.misses, self.stats.writes),
+            )
+
+    def close(self):
+        with self._db_lock:
+            self._db.close()
+
+
+def database_path(path=None):
+    """`path` or `cache.shared_path`, relative paths are resolved from the project root"""
+    path = path or settings.cache.shared_path
+    return path if os.path.isabs(path) else os.path.join(ROOT_DIR, path)
+
+
+def aggregate_stats(path=None) -> SharedCacheStats:
+    """Sum of the counters saved by every process using the database,
+    None if it does not exist"""
+    path = database_path(path)
+    if not os.path.exists(path):
+        return None
+    db = sqlite3.connect(path)
+    try:
+        rows = db.execute("SELECT hits, shared_hits, misses, writes FROM stats").fetchall()
+    except sqlite3.OperationalError:
+        return None  # no process created the schema
+    finally:
+        db.close()
+    stats = SharedCacheStats()
+    for hits, shared_hits, misses, writes in rows:
+        stats.hits += hits
+        stats.shared_hits += shared_hits
+        stats.misses += misses
+        stats.writes += writes
+    return stats
+
+
+def reset_shared_cache(path=None):
+    """Remove the database and its WAL files, called once per test run"""
+    path = database_path(path)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
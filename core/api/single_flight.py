@@ -0,0 +1,120 @@
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+from config import settings
+
+
+class SingleFlightStats:
+    """Counters of a `SingleFlight` or `AsyncSingleFlight` group"""
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0  # calls served by another caller's in-flight request
+
+    def __repr__(self):
+        return f"SingleFlightStats(calls={self.calls}, coalesced={self.coalesced})"
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time across threads.
+
+    The first caller of a key runs `func`, callers arriving while it is in
+    flight wait and get the same result (or exception) instead of running it
+    again. Nothing is kept once the call finishes.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args):
+        with self._lock:
+            self.stats.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.stats.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    `SingleFlight` for coroutines of one event loop.
+
+    The call runs as a task, so a cancelled caller does not cancel it for the
+    others waiting on the same key.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._calls = {}
+
+    async def do(self, key, func, *args):
+        self.stats.calls += 1
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(func(*args))
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        self._calls.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller was cancelled
+
+
+def flight_key(verb, url, params, headers, follow_redirects):
+    """Identity of a request: two requests with the same key get the same response"""
+    return (
+        verb.lower(),
+        url,
+        tuple(sorted(params.items())) if params else None,
+        tuple(sorted((k.lower(), v) for k, v in headers.items())) if headers else None,
+        follow_redirects,
+    )
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(url):
+    """Group shared by all sync clients of the process for the host of `url`,
+    None when disabled via `coalesce_requests`"""
+    if not settings.coalesce_requests:
+        return None
+    host = urlparse(url).netloc
+    with _groups_lock:
+        if host not in _groups:
+            _groups[host] = SingleFlight()
+        return _groups[host]
@@ -0,0 +1,395 @@
+"""
+Local stand-in for the Hacker News API used for offline load and retry tests.
+
+Serves the story lists (`/v0/topstories.json`, `newstories`, `beststories`,
+`askstories`, `showstories`, `jobstories`), `/v0/item/{id}.json`,
+`/v0/maxitem.json` and `/v0/updates.json` from a seeded synthetic item graph,
+with injectable latency, 429 bursts and `null` items.
+
+Usage:
+    python -m core.api.stub_server --port 8080 --stories 500
+    python -m core.api.stub_server --port 8080 --http2  # HTTP/2 with prior knowledge
+"""
+import argparse
+import json
+import random
+import re
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import h2.config
+import h2.connection
+import h2.events
+
+from config import settings
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+ITEM_PATH = re.compile(r"^/v0/item/(\d+)\.json$")
+STORY_LIST_PATH = re.compile(r"^/v0/(top|new|best|ask|show|job)stories\.json$")
+NULL_BODY = b"null"
+MAX_UPDATES = 100  # the API lists about this many recently changed items
+
+
+class StubItemGraph:
+    """
+    Seeded synthetic stories with comment trees.
+
+    Stories get 0..`max_kids` top-level comments (so stories with and without
+    comments both exist), every comment gets up to `max_kids` replies down to
+    `depth` levels. A `deleted_fraction` / `dead_fraction` of comments are
+    marked deleted / dead and a `null_fraction` of top stories resolve to
+    `null`. Top stories list every story; new and best stories list all of
+    them by ID and by score, ask, show and job stories overlapping tenths.
+    Item bodies are serialized once up front, `update_item()` changes one and
+    lists it in `updates`.
+    """
+
+    def __init__(
+        self,
+        seed=0,
+        stories=500,
+        depth=3,
+        max_kids=5,
+        deleted_fraction=0.05,
+        dead_fraction=0.02,
+        null_fraction=0.0,
+    ):
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._next_id = stories + 1
+        self.items = {}  # id -> serialized item
+        self.top_stories = list(range(1, stories + 1))
+        self.max_item = stories
+        self.depth = depth
+        self.max_kids = max_kids
+        self.deleted_fraction = deleted_fraction
+        self.dead_fraction = dead_fraction
+
+        scores = {}
+        for story_id in self.top_stories:
+            if self._random.random() < null_fraction:
+                continue  # listed in top stories but resolves to null
+            kids, descendants = self._comments(story_id, level=1)
+            scores[story_id] = self._random.randrange(1, 1000)
+            story = {
+                "by": f"user{self._random.randrange(1000)}",
+                "descendants": descendants,
+                "id": story_id,
+                "score": scores[story_id],
+                "time": 1700000000 + story_id,
+                "title": f"Story {story_id}",
+                "type": "story",
+                "url": f"https://example.com/{story_id}",
+            }
+            if kids:
+                story["kids"] = kids
+            self.items[story_id] = json.dumps(story).encode()
+        self.max_item = max(self.max_item, self._next_id - 1)
+        lists_random = random.Random(seed)  # keeps the items independent of the lists
+        self.story_lists = {
+            "top": self.top_stories,
+            "new": sorted(self.top_stories, reverse=True),
+            "best": sorted(scores, key=scores.get, reverse=True),
+            **{name: [story_id for story_id in self.top_stories if lists_random.random() < 0.1]
+               for name in ("ask", "show", "job")},
+        }
+        self.story_list_bodies = {name: json.dumps(ids).encode() for name, ids in self.story_lists.items()}
+        self.updates = []  # most recently changed item IDs first
+        self.updates_body = json.dumps({"items": [], "profiles": []}).encode()
+        self._lock = threading.Lock()
+
+    def _comments(self, parent_id, level):
+        """Generate the replies of `parent_id`, returns (kid IDs, descendant count)"""
+        if level > self.depth:
+            return [], 0
+        kids, descendants = [], 0
+        for _ in range(self._random.randint(0, self.max_kids)):
+            comment_id = self._next_id
+            self._next_id += 1
+            comment = {"id": comment_id, "parent": parent_id, "time": 1700000000 + comment_id, "type": "comment"}
+            roll = self._random.random()
+            if roll < self.deleted_fraction:
+                comment["deleted"] = True
+            else:
+                comment["by"] = f"user{self._random.randrange(1000)}"
+                comment["text"] = f"Comment {comment_id}"
+                if roll < self.deleted_fraction + self.dead_fraction:
+                    comment["dead"] = True
+            replies, reply_descendants = self._comments(comment_id, level + 1)
+            if replies:
+                comment["kids"] = replies
+            self.items[comment_id] = json.dumps(comment).encode()
+            kids.append(comment_id)
+            descendants += 1 + reply_descendants
+        return kids, descendants
+
+    def item(self, item_id):
+        return self.items.get(item_id, NULL_BODY)
+
+    def update_item(self, item_id, **fields):
+        """Change fields of an existing item and list it in `updates`"""
+        with self._lock:
+            item = json.loads(self.items[item_id])
+            item.update(fields)
+            self.items[item_id] = json.dumps(item).encode()
+            self.updates = [item_id] + [i for i in self.updates if i != item_id][:MAX_UPDATES - 1]
+            self.updates_body = json.dumps({"items": self.updates, "profiles": []}).encode()
+
+
+class StubFaults:
+    """Injectable server behaviour, can be changed while the server runs
+
+    latency:       seconds added to every response
+    jitter:        extra random latency of up to `jitter` seconds
+    burst_every:   every `burst_every` requests start a 429 burst (0 disables)
+    burst_length:  number of consecutive 429 responses in a burst
+    retry_after:   `Retry-After` header sent with 429 responses
+    max_rate:      answer 429 above this many requests per second (0 disables),
+                   a token bucket holding 1/10 s worth of requests
+    fail_items:    item IDs answered with 500
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, burst_every=0, burst_length=1, retry_after=0, max_rate=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.retry_after = retry_after
+        self.max_rate = max_rate
+        self.fail_items = set()
+        self.requests = 0
+        self.throttled = 0
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def throttle(self):
+        """Count the request and tell whether it is answered with 429"""
+        with self._lock:
+            count = self.requests
+            self.requests += 1
+            throttled = bool(self.burst_every) and count % self.burst_every < self.burst_length
+            if self.max_rate and not throttled:
+                now = time.monotonic()
+                capacity = max(self.max_rate / 10, 1)
+                self._tokens = min(capacity, self._tokens + (now - self._updated) * self.max_rate)
+                self._updated = now
+                throttled = self._tokens < 1
+                if not throttled:
+                    self._tokens -= 1
+            if throttled:
+                self.throttled += 1
+        return throttled
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.random() * self.jitter)
+
+
+def _route(graph, faults, path):
+    """Status, body and extra headers of the response to `GET path`"""
+    if faults.throttle():
+        return 429, b'{"error": "Too Many Requests"}', {"Retry-After": str(faults.retry_after)}
+    path = path.split("?", 1)[0]
+    match = STORY_LIST_PATH.match(path)
+    if match:
+        return 200, graph.story_list_bodies[match.group(1)], {}
+    if path == "/v0/maxitem.json":
+        return 200, str(graph.max_item).encode(), {}
+    if path == "/v0/updates.json":
+        return 200, graph.updates_body, {}
+    match = ITEM_PATH.match(path)
+    if match:
+        item_id = int(match.group(1))
+        if item_id in faults.fail_items:
+            return 500, b'{"error": "Internal Server Error"}', {}
+        return 200, graph.item(item_id), {}
+    return 404, b'{"error": "Not Found"}', {}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like Firebase
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.faults.delay()
+        self._send(*_route(self.server.graph, self.server.faults, self.path))
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # keep request logging out of throughput measurements
+
+
+class _StubH2Handler(socketserver.BaseRequestHandler):
+    """
+    One HTTP/2 connection with prior knowledge (h2c), as Firebase serves
+    HTTP/2 over TLS. Every stream is answered on its own thread so latency
+    faults overlap like they do on the HTTP/1.1 server; frames are written
+    under a lock and respect the client's flow control windows.
+    """
+
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        self.window_updated = threading.Condition()  # also guards the connection state
+        self.closed = False
+
+    def handle(self):
+        with self.window_updated:
+            self.connection.initiate_connection()
+            self._flush()
+        while not self.closed:
+            data = self.request.recv(65535)
+            if not data:
+                break
+            with self.window_updated:
+                events = self.connection.receive_data(data)
+                self._flush()
+                self.window_updated.notify_all()
+            for event in events:
+                if isinstance(event, h2.events.RequestReceived):
+                    path = dict(event.headers)[b":path"].decode()
+                    threading.Thread(target=self._respond, args=(event.stream_id, path), daemon=True).start()
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    self.closed = True
+        with self.window_updated:
+            self.closed = True
+            self.window_updated.notify_all()
+
+    def _respond(self, stream_id, path):
+        self.server.faults.delay()
+        status, body, headers = _route(self.server.graph, self.server.faults, path)
+        response_headers = [
+            (":status", str(status)),
+            ("content-type", "application/json; charset=utf-8"),
+            ("content-length", str(len(body))),
+        ] + [(name.lower(), value) for name, value in headers.items()]
+        with self.window_updated:
+            if self.closed:
+                return
+            self.connection.send_headers(stream_id, response_headers, end_stream=not body)
+            self._flush()
+            view = memoryview(body)
+            while view:
+                window = min(
+                    self.connection.local_flow_control_window(stream_id),
+                    self.connection.max_outbound_frame_size,
+                )
+                if window <= 0:
+                    self.window_updated.wait()
+                    if self.closed:
+                        return
+                    continue
+                chunk, view = view[:window], view[window:]
+                self.connection.send_data(stream_id, bytes(chunk), end_stream=not view)
+                self._flush()
+
+    def _flush(self):
+        data = self.connection.data_to_send()
+        if data:
+            try:
+                self.request.sendall(data)
+            except OSError:
+                self.closed = True
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # accept bursts of concurrent connections
+
+
+class _StubH2Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+
+class HackerNewsStubServer:
+    """Threaded stub server, use as a context manager or `start()` / `stop()`
+
+    Speaks HTTP/1.1 with keep-alive, or HTTP/2 with prior knowledge when
+    `http2` is set.
+    """
+
+    def __init__(
+        self, graph: StubItemGraph = None, faults: StubFaults = None, host="127.0.0.1", port=0, http2=False
+    ):
+        self.graph = graph or StubItemGraph()
+        self.faults = faults or StubFaults()
+        self.http2 = http2
+        if http2:
+            self._server = _StubH2Server((host, port), _StubH2Handler)
+        else:
+            self._server = _StubHTTPServer((host, port), _StubHandler)
+        self._server.graph = self.graph
+        self._server.faults = self.faults
+        self._thread = None
+
+    @classmethod
+    def from_settings(cls, host="127.0.0.1", port=0, **overrides):
+        """Build graph and faults from the `stub` section of settings.yaml"""
+        options = {**settings.stub, **overrides}
+        graph_options = {k: options[k] for k in ("seed", "stories", "depth", "max_kids",
+                                                 "deleted_fraction", "dead_fraction", "null_fraction")}
+        fault_options = {k: options[k] for k in ("latency", "jitter", "burst_every",
+                                                 "burst_length", "retry_after", "max_rate")}
+        return cls(StubItemGraph(**graph_options), StubFaults(**fault_options), host, port, options["http2"])
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        protocol = "HTTP/2" if self.http2 else "HTTP/1.1"
+        logger.info(f"Hacker News {protocol} stub server with {len(self.graph.items)} items at {self.url}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8080)
+    for name, value in settings.stub.items():
+        flag = f"--{name.lower().replace('_', '-')}"
+        if isinstance(value, bool):
+            parser.add_argument(flag, action=argparse.BooleanOptionalAction, default=value)
+        else:
+            parser.add_argument(flag, type=type(value), default=value)
+    args = vars(parser.parse_args())
+    with HackerNewsStubServer.from_settings(**args) as server:
+        print(f"Serving {len(server.graph.items)} items at {server.url}, Ctrl+C to stop")
+        try:
+            server._thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,84 @@
-import errno
+import atexit
 import logging
 import os
-from logging import config
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 
 from config import ROOT_DIR
 
+LOGGERS = {  # project loggers and whether they propagate to pytest's handlers
+    'core': True,
+    'core.api.trace': False,
+    'tests': True,
+}
 
-try:
-    os.makedirs(f'{ROOT_DIR}/output')
-except OSError as e:
-    if e.errno != errno.EEXIST:
-        raise
-
-config.dictConfig(
-    {
-        'version': 1,
-        'formatters': {
-            'default': {
-                'format': '%(asctime)s.%(msecs)03d %(levelname)s %(name)s:%(lineno)s - %(message)s',
-                'datefmt': '%Y-%m-%d %H:%M:%S',
-            }
-        },
-        'handlers': {
-            'file': {
-                'level': 'DEBUG',
-                'class': 'logging.handlers.RotatingFileHandler',
-                'formatter': 'default',
-                'mode': 'a',
-                'filename': f'{ROOT_DIR}/output/test.log',
-                'maxBytes': 4000000,
-                'backupCount': 0,
-            }
-        },
-        'loggers': {
-            'core': {'level': 'DEBUG', 'handlers': ['file']},
-            'tests': {'level': 'DEBUG', 'handlers': ['file']},
-        },
-        'disable_existing_loggers': False,
-    }
-)
+_log_queue = queue.SimpleQueue()
+_lock = threading.Lock()
+_configured = False
+_listener = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread
+
+    The stock `QueueHandler.prepare` formats the record on the calling thread;
+    here the record is queued as is, so lazy message arguments are only
+    rendered by the file handler behind the `QueueListener`. The listener and
+    its log file are started by the first record.
+    """
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        if _listener is None:
+            _start_listener()
+        super().enqueue(record)
+
+
+def _start_listener():
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        os.makedirs(f'{ROOT_DIR}/output', exist_ok=True)
+        file_handler = RotatingFileHandler(
+            f'{ROOT_DIR}/output/test.log', mode='a', maxBytes=4000000, backupCount=0
+        )
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(
+            logging.Formatter(
+                '%(asctime)s.%(msecs)03d %(levelname)s %(name)s:%(lineno)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S',
+            )
+        )
+        listener = QueueListener(_log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)  # flush queued records to the file on exit
+        _listener = listener
+
+
+def _configure():
+    """Attach the queue handler to the project loggers, once per process"""
+    global _configured
+    with _lock:
+        if _configured:
+            return
+        handler = DeferredQueueHandler(_log_queue)
+        handler.setLevel(logging.DEBUG)
+        for name, propagate in LOGGERS.items():
+            logger = logging.getLogger(name)
+            logger.setLevel(logging.DEBUG)
+            logger.addHandler(handler)
+            logger.propagate = propagate
+        _configured = True
 
 
 def get_logger(name):
     """All test modules should use this method to get the logger"""
+    if not _configured:
+        _configure()
     logger = logging.getLogger(name)
     return logger
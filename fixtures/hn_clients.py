@@ -1,7 +1,103 @@
+import asyncio
+import inspect
+import os
+import threading
+
 import pytest
 
+from config import settings
+from core.api.cache import ResponseCache
+from core.api.shared_cache import SharedResponseCache, aggregate_stats, reset_shared_cache
+from core.api.clients.async_hackernews_client import AsyncHackerNewsClient
 from core.api.clients.hackernews_client import HackerNewsClient
+from core.logconfig import get_logger
+
+logger = get_logger(__name__)
+
+HN_CLIENT_KINDS = ("sync", "async")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--hn-client",
+        choices=HN_CLIENT_KINDS + ("all",),
+        default="sync",
+        help="Hacker News client used by `hn_client` tests: sync, async or all",
+    )
+
+
+def pytest_configure(config):
+    if settings.cache.enabled and settings.cache.shared and not hasattr(config, "workerinput"):
+        reset_shared_cache()  # controller only, before xdist workers start
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if settings.cache.enabled and settings.cache.shared and not hasattr(config, "workerinput"):
+        stats = aggregate_stats()
+        if stats is not None:
+            terminalreporter.write_line(f"Hacker News shared response cache: {stats}")
+
+
+def pytest_generate_tests(metafunc):
+    if "hn_client" in metafunc.fixturenames:
+        kind = metafunc.config.getoption("--hn-client")
+        kinds = HN_CLIENT_KINDS if kind == "all" else (kind,)
+        metafunc.parametrize("hn_client", kinds, indirect=True)
+
+
+class AsyncClientRunner:
+    """Runs `AsyncHackerNewsClient` coroutines on an event loop in a background
+    thread, so synchronous (and multi-threaded) tests and helpers can use the
+    async client unchanged"""
+
+    def __init__(self, client: AsyncHackerNewsClient):
+        self._client = client
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if inspect.iscoroutinefunction(attr):
+            return lambda *args, **kwargs: self._run(attr(*args, **kwargs))
+        return attr
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+@pytest.fixture(scope="session")
+def hn_cache():
+    """Response cache shared by all `hn_client` instances of the session,
+    None when disabled via `cache.enabled` in settings.yaml. Under
+    pytest-xdist with `cache.shared` it is also shared between workers."""
+    if not settings.cache.enabled:
+        yield None
+        return
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker and settings.cache.shared:
+        cache = SharedResponseCache()
+        yield cache
+        cache.save_stats(worker)
+        cache.close()
+    else:
+        cache = ResponseCache()
+        yield cache
+    logger.info(f"Hacker News response cache: {cache.stats}")
+
 
 @pytest.fixture
-def hn_client():
-    yield HackerNewsClient()
+def hn_client(request, hn_cache):
+    if getattr(request, "param", "sync") == "async":
+        client = AsyncClientRunner(AsyncHackerNewsClient(cache=hn_cache))
+        yield client
+        client.close()
+    else:
+        with HackerNewsClient(cache=hn_cache) as client:
+            yield client
@@ -0,0 +1,17 @@
+import os
+
+from config import settings
+from core.api.metrics import get_metrics
+
+
+def pytest_sessionfinish(session):
+    """Write the client metrics of the session next to the test reports"""
+    metrics = get_metrics()
+    if metrics is None or not metrics.endpoints:
+        return
+    path = settings.metrics.report
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:  # every worker has its own samples
+        root, extension = os.path.splitext(path)
+        path = f"{root}-{worker}{extension}"
+    metrics.save(path)
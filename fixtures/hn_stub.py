@@ -0,0 +1,28 @@
+import pytest
+
+from core.api.clients.hackernews_client import HackerNewsClient
+from core.api.rate_limiter import RateLimiter
+from core.api.stub_server import HackerNewsStubServer
+
+
+@pytest.fixture(scope="session")
+def hn_stub_server():
+    """Local Hacker News stub configured by the `stub` section of settings.yaml"""
+    with HackerNewsStubServer.from_settings() as server:
+        yield server
+
+
+@pytest.fixture
+def hn_stub_client(hn_stub_server):
+    """Client against the stub server, faults are reset after each test
+
+    Each test gets its own rate limiter, so 429s injected by one test do not
+    slow down the next.
+    """
+    faults = vars(hn_stub_server.faults).copy()
+    with HackerNewsClient(hn_stub_server.url) as client:
+        if client.rate_limiter is not None:
+            client.rate_limiter = RateLimiter()
+        yield client
+    for name in ("latency", "jitter", "burst_every", "burst_length", "retry_after", "max_rate"):
+        setattr(hn_stub_server.faults, name, faults[name])
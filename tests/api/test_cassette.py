@@ -0,0 +1,48 @@
+import json
+
+import pytest
+from core.api.cassette import RECORD, REPLAY, Cassette, build_response, response_meta
+
+
+def _response(url, item, status=200):
+    meta = json.dumps({"status": status, "reason": "OK", "headers": {"Content-Type": "application/json"},
+                       "elapsed": 0.01})
+    return build_response(url, meta, json.dumps(item).encode())
+
+
+@pytest.mark.unit
+class TestCassette:
+    def test_record_then_replay(self, tmp_path):
+        path = str(tmp_path / "hn.cassette")
+        recorder = Cassette(path, RECORD)
+        recorder.record("get", "http://hn/v0/item/1.json", None, _response("http://hn/v0/item/1.json", {"id": 1}))
+        recorder.record("get", "http://hn/v0/item/2.json", {"print": "pretty"},
+                        _response("http://hn/v0/item/2.json", {"id": 2}, status=404))
+        recorder.record("get", "http://hn/v0/item/1.json", None,
+                        _response("http://hn/v0/item/1.json", {"id": 1, "score": 5}))  # later recording wins
+
+        player = Cassette(path, REPLAY)
+        first = player.play("GET", "http://hn/v0/item/1.json")
+        assert first.json() == {"id": 1, "score": 5}
+        assert first.status_code == 200 and first.headers["content-type"] == "application/json"
+        second = player.play("get", "http://hn/v0/item/2.json", {"print": "pretty"})
+        assert second.status_code == 404 and second.json() == {"id": 2}
+        assert json.loads(response_meta(second))["elapsed"] == 0.01
+        player.close()
+
+    def test_missing_record_is_a_connection_error(self, tmp_path):
+        path = str(tmp_path / "hn.cassette")
+        Cassette(path, RECORD).record("get", "http://hn/v0/item/1.json", None,
+                                      _response("http://hn/v0/item/1.json", {"id": 1}))
+        player = Cassette(path, REPLAY)
+        with pytest.raises(ConnectionError, match="No recorded response"):
+            player.play("get", "http://hn/v0/item/2.json")
+        player.close()
+
+    def test_empty_cassette(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="record it first"):
+            Cassette(str(tmp_path / "missing.cassette"), REPLAY).play("get", "http://hn/v0/item/1.json")
+
+    def test_unknown_mode(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown cassette mode"):
+            Cassette(str(tmp_path / "hn.cassette"), "rewind")
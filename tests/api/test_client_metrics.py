@@ -0,0 +1,26 @@
+import random
+
+import pytest
+from core.api.metrics import ClientMetrics, Histogram, summarize_timings
+
+
+@pytest.mark.unit
+class TestHistogram:
+    def test_percentiles_close_to_exact(self):
+        rng = random.Random(1)
+        samples = [rng.lognormvariate(-4, 1) for _ in range(10000)]
+        histogram = Histogram()
+        for seconds in samples:
+            histogram.add(seconds)
+        exact, summary = summarize_timings(samples), histogram.summary()
+        assert (summary["count"], summary["min"], summary["max"]) == (exact["count"], exact["min"], exact["max"])
+        for name in ("p50", "p95", "p99"):
+            assert summary[name] == pytest.approx(exact[name], rel=0.07), name
+
+    def test_memory_does_not_grow_with_samples(self):
+        metrics = ClientMetrics()
+        for _ in range(10000):
+            metrics.observe("/v0/item/{id}.json", "send", 0.01)
+        histogram = metrics._timings["/v0/item/{id}.json"]["send"]
+        assert len(histogram.counts) == Histogram.BUCKETS
+        assert metrics.summary()["/v0/item/{id}.json"]["timings"]["send"]["count"] == 10000
@@ -0,0 +1,245 @@
+import asyncio
+import gzip
+import json
+import threading
+
+import pytest
+from config import settings
+from core.api.clients.async_hackernews_client import AsyncHackerNewsClient
+from core.api.clients.hackernews_client import HackerNewsClient
+from core.api.cassette import RECORD, REPLAY, Cassette
+from core.api.export import Exporter
+from core.api.helpers.comment_crawler import CommentTreeCrawler
+from core.api.item_store import ItemStore
+from core.api.load_test import LoadTest
+from core.api.shared_cache import SharedResponseCache
+from core.api.stub_server import HackerNewsStubServer
+from core.api.helpers.hacker_news_helpers import (
+    assert_top_stories_response,
+    assert_item_top_story_response,
+    assert_item_comment_response,
+    get_first_deleted_comment,
+    get_first_story_comments,
+    top_stories
+)
+
+from core.logconfig import get_logger
+
+
+logger = get_logger(__name__)
+
+@pytest.mark.stub
+class TestStubServer:
+    def test_stub_top_stories(self, hn_stub_client):
+        assert_top_stories_response(top_stories(hn_stub_client))
+
+    def test_stub_story_comments(self, hn_stub_client):
+        story = get_first_story_comments(client=hn_stub_client, item_ids=top_stories(hn_stub_client))
+        assert_item_top_story_response(story)
+        for result in hn_stub_client.get_items(story['kids']):
+            assert_item_comment_response(result.json())
+
+    def test_stub_batch_all_top_stories(self, hn_stub_client):
+        all_top_stories = top_stories(hn_stub_client)
+        results = hn_stub_client.get_items(all_top_stories)
+        assert [result.item_id for result in results] == all_top_stories, "results not in input order"
+        assert all(result.ok for result in results), "batch has failed items"
+
+    def test_stub_crawl_whole_thread(self, hn_stub_client):
+        story = get_first_story_comments(client=hn_stub_client, item_ids=top_stories(hn_stub_client))
+        crawler = CommentTreeCrawler(hn_stub_client, story['id'])
+        for comment in crawler:
+            assert_item_comment_response(comment)
+        assert crawler.stats.yielded == story['descendants'], "not every comment was crawled"
+
+    def test_stub_item_record(self, hn_stub_client):
+        story = get_first_story_comments(client=hn_stub_client, item_ids=top_stories(hn_stub_client))
+        record = hn_stub_client.get_item_record(item_id=story['id'])
+        assert record.to_dict() == story, "item record differs from the item"
+        assert list(record['kids']) == story['kids'], "kids differ"
+
+    def test_stub_retries_429_bursts(self, hn_stub_client, hn_stub_server):
+        hn_stub_server.faults.burst_every = 2
+        hn_stub_server.faults.burst_length = 1
+        throttled = hn_stub_server.faults.throttled
+        for item_id in range(1, 6):
+            assert hn_stub_client.get_item(item_id=item_id).json()['id'] == item_id
+        assert hn_stub_server.faults.throttled > throttled, "no 429 responses were served"
+
+    def test_stub_unknown_item_is_null(self, hn_stub_client):
+        response = hn_stub_client.get_item(item_id=999999999)
+        assert response.content() == 'null', "content is not null"
+
+    def test_stub_rate_limiter_adapts_to_429(self, hn_stub_client, hn_stub_server):
+        hn_stub_server.faults.max_rate = 50
+        limiter = hn_stub_client.rate_limiter
+        results = hn_stub_client.get_items(range(1, 201), max_concurrency=10)
+        assert limiter.stats.throttled_responses > 0, "no 429 responses were seen"
+        assert limiter.rate < limiter.max_rate, "rate was not lowered after 429 responses"
+        assert all(result.ok for result in results), "throttled items were not delivered"
+        assert limiter.stats.retries_denied == 0
+
+    def test_stub_item_store_refetches_updated_items(self, hn_stub_client, hn_stub_server):
+        store = ItemStore(hn_stub_client)
+        assert len(store.get_many(range(1, 11))) == 10, "items were not stored"
+        store.sync()
+        hn_stub_server.graph.update_item(3, score=1234)
+        assert store.sync() == [3], "only the updated item should be refetched"
+        assert store.get(3)['score'] == 1234, "updated item was not refreshed"
+        assert store.max_item == hn_stub_client.get_max_item().json()
+        assert store.stats.fetched == 10 and store.stats.refreshed == 1
+
+    def test_stub_concurrent_identical_requests_are_coalesced(self, hn_stub_client, hn_stub_server):
+        hn_stub_server.faults.latency = 0.3
+        requests = hn_stub_server.faults.requests
+        coalesced = hn_stub_client.single_flight.stats.coalesced
+        barrier = threading.Barrier(8)
+        responses = []
+
+        def fetch():
+            barrier.wait()
+            responses.append(hn_stub_client.get_item(item_id=5))
+
+        threads = [threading.Thread(target=fetch) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert hn_stub_server.faults.requests - requests == 1, "identical requests were not coalesced"
+        assert hn_stub_client.single_flight.stats.coalesced - coalesced == 7
+        assert all(response is responses[0] for response in responses), "waiters got different responses"
+
+    def test_stub_async_identical_requests_are_coalesced(self, hn_stub_client, hn_stub_server):
+        hn_stub_server.faults.latency = 0.3
+        requests = hn_stub_server.faults.requests
+
+        async def fetch_all():
+            async with AsyncHackerNewsClient(hn_stub_server.url) as client:
+                responses = await asyncio.gather(*(client.get_item(item_id=6) for _ in range(8)))
+                return client.single_flight.stats, responses
+
+        stats, responses = asyncio.run(fetch_all())
+        assert hn_stub_server.faults.requests - requests == 1, "identical requests were not coalesced"
+        assert stats.coalesced == 7
+        assert all(response.json()['id'] == 6 for response in responses)
+
+    def test_stub_shared_cache_serves_other_processes(self, hn_stub_server, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        writer, reader = SharedResponseCache(path), SharedResponseCache(path)  # one per worker
+        with HackerNewsClient(hn_stub_server.url, cache=writer) as client:
+            expected = client.get_item(item_id=7).json()
+        requests = hn_stub_server.faults.requests
+        with HackerNewsClient(hn_stub_server.url, cache=reader) as client:
+            assert client.get_item(item_id=7).json() == expected
+        assert hn_stub_server.faults.requests == requests, "item was fetched again"
+        assert reader.stats.shared_hits == 1 and writer.stats.writes == 1
+        writer.close()
+        reader.close()
+
+    def test_stub_client_metrics(self, hn_stub_client, hn_stub_server):
+        metrics = hn_stub_client.metrics
+        hn_stub_server.faults.burst_every = 2
+        hn_stub_server.faults.burst_length = 1
+        before = metrics.summary().get("/v0/item/{id}.json", {"requests": 0, "retries": 0})
+        for item_id in range(1, 6):
+            hn_stub_client.get_item(item_id=item_id).json()
+        after = metrics.summary()["/v0/item/{id}.json"]
+        assert after["retries"] > before["retries"], "retries were not counted"
+        assert after["requests"] - before["requests"] >= 5
+        assert {"send", "ttfb", "transfer", "decode"} <= after["timings"].keys()
+
+    def test_stub_export_resumes_from_checkpoint(self, hn_stub_client, tmp_path):
+        output = str(tmp_path / "range.jsonl.gz")
+        exporter = Exporter(hn_stub_client, "range", output, start=1, end=250, chunk_size=100)
+        assert exporter.run(max_chunks=1).exported == 100
+        resumed = Exporter(hn_stub_client, "range", output, start=1, end=250, chunk_size=100)
+        assert resumed.run().chunks == 2, "export did not resume after the first chunk"
+        with gzip.open(output) as f:
+            ids = [json.loads(line)['id'] for line in f]
+        assert ids == list(range(1, 251)), "exported items are missing or duplicated"
+
+    def test_stub_export_records_failed_comments(self, hn_stub_client, hn_stub_server, tmp_path):
+        story_ids = top_stories(hn_stub_client)
+        story = get_first_story_comments(client=hn_stub_client, item_ids=story_ids)
+        failing = story['kids'][0]
+        hn_stub_server.faults.fail_items = {failing}
+        output = str(tmp_path / "top.jsonl.gz")
+        exporter = Exporter(hn_stub_client, "top", output, limit=story_ids.index(story['id']) + 1)
+        assert exporter.run().failed == 1, "failed comment was not counted"
+        with open(f"{output}.checkpoint") as f:
+            assert json.load(f)["failed"] == [failing], "failed comment is not in the checkpoint"
+        with gzip.open(output) as f:
+            assert failing not in [json.loads(line)['id'] for line in f]
+
+    def test_stub_http2_transport_multiplexes_batch(self):
+        with HackerNewsStubServer.from_settings(http2=True) as server:
+            with HackerNewsClient(server.url, transport="http2") as client:
+                results = client.get_items(range(1, 41), max_concurrency=20)
+                assert results[0].response.response.http_version == "HTTP/2"
+            expected = [json.loads(server.graph.item(item_id)) for item_id in range(1, 41)]
+        assert [result.json() for result in results] == expected
+        assert server.faults.requests == 40
+        assert not [thread for thread in threading.enumerate() if thread.name == "http2-transport"], \
+            "batch threads created extra transports that were never closed"
+
+    def test_stub_story_lists_fetch_each_story_once(self, hn_stub_server):
+        with HackerNewsClient(hn_stub_server.url) as client:  # no cache, every fetch hits the server
+            requests = hn_stub_server.faults.requests
+            story_lists = client.get_story_lists(limit=50)
+            assert hn_stub_server.faults.requests - requests == 6 + story_lists.unique
+        assert story_lists.unique < story_lists.total, "stub story lists do not overlap"
+        for name, ids in hn_stub_server.graph.story_lists.items():
+            assert [result.item_id for result in story_lists[name]] == ids[:50], f"{name} stories out of order"
+            assert all(result.json()['id'] == result.item_id for result in story_lists[name])
+
+    def test_stub_no_story_lists(self, hn_stub_client, hn_stub_server):
+        async def fetch_none():
+            async with AsyncHackerNewsClient(hn_stub_server.url) as client:
+                return await client.get_story_lists([])
+
+        for story_lists in (hn_stub_client.get_story_lists([]), asyncio.run(fetch_none())):
+            assert (story_lists.ids, story_lists.total, story_lists.unique) == ({}, 0, 0)
+
+    def test_stub_stream_mode_releases_responses_and_limits_body_size(self, hn_stub_server):
+        response_settings = settings.response.to_dict()
+        settings.set("response.stream", True)
+        try:
+            with HackerNewsClient(hn_stub_server.url) as client:
+                response = client.get_item(item_id=1)
+                assert response.response is None, "response was not released after parsing"
+                assert response.status_code() == 200 and response.json()['id'] == 1
+                response.json()['id'] = 0
+                assert response.json()['id'] == 1, "decoded JSON is shared between callers"
+                settings.set("response.max_body_size", 100)
+                with pytest.raises(ConnectionError, match="exceeds 100 bytes"):
+                    client.get_top_stories()
+        finally:
+            settings.set("response", response_settings)
+
+    def test_stub_load_test_checks_slos(self, hn_stub_client, hn_stub_server):
+        requests = hn_stub_server.faults.requests
+        result = LoadTest(hn_stub_client, duration=1, rate=100, concurrency=5, seed=0).run()
+        assert result.requests == 100 and set(result.latencies) == {"topstories", "item"}
+        assert hn_stub_server.faults.requests - requests == 101, "load test requests were coalesced"
+        assert result.violations(settings.load_test.slo) == []
+        breached = result.violations({"p95": 0.0, "p99": 0.0, "error_rate": 0.0})
+        assert [violation.split()[0] for violation in breached] == ["p95", "p99"]
+
+    def test_stub_cassette_replays_look_ahead_searches_offline(self, tmp_path):
+        path = str(tmp_path / "hn.cassette")
+
+        def searches(client):
+            story = get_first_story_comments(client, item_ids=top_stories(client), comments=False)
+            thread = get_first_story_comments(client, item_ids=top_stories(client))
+            return story, get_first_deleted_comment(client, comment_ids=thread['kids'])
+
+        with HackerNewsStubServer.from_settings(jitter=0.005) as server:  # look-ahead order varies
+            with HackerNewsClient(server.url) as client:
+                client.cassette = Cassette(path, RECORD)
+                expected = searches(client)
+        cassette = Cassette(path, REPLAY)
+        for _ in range(5):  # server is stopped, every response comes from the cassette
+            with HackerNewsClient(server.url) as client:
+                client.cassette = cassette
+                assert searches(client) == expected
+        cassette.close()
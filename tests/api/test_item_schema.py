@@ -0,0 +1,40 @@
+import pytest
+from core.api.helpers.item_schema import assert_items_valid, validate_items
+
+STORY = {"id": 1, "type": "story", "time": 1700000000, "by": "pg", "title": "Story", "kids": [2, 3]}
+COMMENT = {"id": 2, "type": "comment", "time": 1700000001, "by": "pg", "text": "Hi", "parent": 1}
+
+
+@pytest.mark.unit
+class TestItemSchema:
+    def test_valid_items(self):
+        assert validate_items([STORY, COMMENT], strict=True) == []
+        assert_items_valid([STORY], item_type="story")
+
+    def test_all_violations_are_reported_with_the_item_id(self):
+        items = [
+            {**STORY, "score": "12"},  # wrong field type
+            {**STORY, "id": 4, "kids": [5, "6"]},  # bad kids element
+            {"id": 7, "type": "comment", "by": "pg"},  # missing required field
+            {"id": 8, "type": "essay", "time": 1700000000},  # unknown type
+            {**COMMENT, "id": 9, "title": "Comments have no title"},  # extra field, strict only
+        ]
+        violations = validate_items(items, strict=True)
+        assert violations == [
+            "item 1: Field 'score' must be int, got str",
+            "item 4: Field 'kids' item must be int, got str (6)",
+            "item 7: Missing required field 'time'",
+            "item 8: Unknown item type 'essay'",
+            "item 9: Unexpected field 'title' for type 'comment'",
+        ]
+        assert len(validate_items(items)) == 4, "extra fields are only reported in strict mode"
+
+        with pytest.raises(AssertionError) as error:
+            assert_items_valid(items, strict=True)
+        message = str(error.value)
+        assert message.startswith("5 item schema violations:")
+        assert all(violation in message for violation in violations)
+
+    def test_expected_type_and_non_dict_items(self):
+        violations = validate_items([COMMENT, None], item_type="story")
+        assert violations == ["item 2: Expected type 'story', got 'comment'", "item #1: must be dict, got NoneType"]
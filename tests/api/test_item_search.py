@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+from core.api.helpers.item_search import find_first_item
+
+
+class _FakeResponse:
+    def __init__(self, item):
+        self.item = item
+
+    def json(self):
+        return self.item
+
+
+class _FakeClient:
+    """`get_item` returning `{"id": id, "match": bool}` after a per-ID delay,
+    or raising for IDs in `failing`"""
+
+    pool_maxsize = 4
+
+    def __init__(self, matching=(), failing=(), delays=None):
+        self.matching = set(matching)
+        self.failing = set(failing)
+        self.delays = delays or {}
+        self.fetched = []
+        self._lock = threading.Lock()
+
+    def get_item(self, item_id):
+        with self._lock:
+            self.fetched.append(item_id)
+        time.sleep(self.delays.get(item_id, 0))
+        if item_id in self.failing:
+            raise ConnectionError(f"Failed to get item {item_id}")
+        return _FakeResponse({"id": item_id, "match": item_id in self.matching})
+
+
+def _matches(item):
+    return item["match"]
+
+
+@pytest.mark.unit
+class TestFindFirstItem:
+    def test_first_match_in_list_order(self):
+        client = _FakeClient(matching={2, 3}, delays={2: 0.2})  # 3 matches first, 2 comes first in the list
+        result = find_first_item(client, [1, 2, 3, 4], _matches)
+        assert result.item_id == 2 and result.item["id"] == 2
+
+    def test_errors_past_the_match_are_ignored(self):
+        client = _FakeClient(matching={1}, failing={2, 3}, delays={1: 0.1})
+        result = find_first_item(client, [1, 2, 3], _matches)
+        assert result.item_id == 1, "look-ahead error past the answer failed the search"
+
+    def test_error_before_a_match_is_raised(self):
+        client = _FakeClient(matching={2}, failing={1}, delays={1: 0.1})
+        with pytest.raises(ConnectionError, match="item 1"):
+            find_first_item(client, [1, 2, 3], _matches)
+
+    def test_returns_without_waiting_for_running_fetches(self):
+        client = _FakeClient(matching={1}, delays={1: 0.05, 3: 3.0})
+        start = time.perf_counter()
+        result = find_first_item(client, [1, 2, 3], _matches)
+        assert result.item_id == 1
+        assert time.perf_counter() - start < 1.0, "search waited for a speculative fetch past the answer"
+
+    def test_no_match(self):
+        result = find_first_item(_FakeClient(), [1, 2, 3], _matches)
+        assert not result.found and result.stats.needed == 3 and result.stats.issued == 3
+
+    def test_search_stats(self):
+        client = _FakeClient(matching={3})
+        result = find_first_item(client, list(range(1, 11)), _matches, window=1)  # sequential
+        stats = result.stats
+        assert (stats.total, stats.needed, stats.issued, stats.cancelled) == (10, 3, 3, 0)
+        assert (stats.wasted, stats.saved) == (0, 7)
+        assert client.fetched == [1, 2, 3]
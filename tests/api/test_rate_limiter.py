@@ -0,0 +1,18 @@
+import pytest
+from core.api.rate_limiter import RateLimiter, RetryBudget
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    def test_retries_spend_the_budget_at_any_rate(self):
+        limiter = RateLimiter(max_rate=100, min_rate=1, budget=RetryBudget(ratio=0, minimum=2))
+        assert limiter.rate > limiter.min_rate
+        assert [limiter.allow_retry() for _ in range(3)] == [True, True, False]
+        assert (limiter.stats.retries, limiter.stats.retries_denied) == (2, 1)
+
+    def test_requests_earn_retries(self):
+        limiter = RateLimiter(max_rate=1000, budget=RetryBudget(ratio=0.5, minimum=0))
+        assert not limiter.allow_retry()
+        limiter.acquire()
+        limiter.acquire()
+        assert limiter.allow_retry(), "two requests at ratio 0.5 did not earn a retry"
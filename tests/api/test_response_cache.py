@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from core.api.api_response import ApiResponse
+from core.api.cache import ResponseCache
+from core.api.cassette import build_response
+
+TTL = {"stories": 30, "item": 300, "final_item": None}
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _response(body):
+    meta = json.dumps({"status": 200, "reason": "OK", "headers": {}, "elapsed": 0.0})
+    return ApiResponse(build_response(None, meta, json.dumps(body).encode()))
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    def test_entries_expire_after_their_endpoint_ttl(self):
+        clock = _FakeClock()
+        cache = ResponseCache(ttl=TTL, clock=clock)
+        cache.set(("stories", "top"), _response([1, 2]))
+        cache.set(("item", 1), _response({"id": 1}))
+        clock.now = 29
+        assert cache.get(("stories", "top")).json() == [1, 2]
+        clock.now = 30
+        assert cache.get(("stories", "top")) is None, "story list outlived its TTL"
+        assert cache.get(("item", 1)).json() == {"id": 1}
+        clock.now = 300
+        assert cache.get(("item", 1)) is None
+        assert cache.stats.expirations == 2 and len(cache) == 0
+
+    def test_deleted_and_dead_items_never_expire(self):
+        clock = _FakeClock()
+        cache = ResponseCache(ttl=TTL, clock=clock)
+        cache.set(("item", 1), _response({"id": 1, "deleted": True}))
+        cache.set(("item", 2), _response({"id": 2, "dead": True}))
+        cache.set(("item", 3), _response({"id": 3}))
+        clock.now = 10 ** 9
+        assert cache.get(("item", 1)) is not None and cache.get(("item", 2)) is not None
+        assert cache.get(("item", 3)) is None
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2, ttl=TTL, clock=_FakeClock())
+        cache.set(("item", 1), _response({"id": 1}))
+        cache.set(("item", 2), _response({"id": 2}))
+        cache.get(("item", 1))  # 2 becomes the least recently used
+        cache.set(("item", 3), _response({"id": 3}))
+        assert cache.get(("item", 2)) is None
+        assert cache.get(("item", 1)) is not None and cache.get(("item", 3)) is not None
+        assert cache.stats.evictions == 1 and len(cache) == 2
+
+    def test_hit_and_miss_counters(self):
+        cache = ResponseCache(ttl=TTL, clock=_FakeClock())
+        assert cache.get(("item", 1)) is None
+        cache.set(("item", 1), _response({"id": 1}))
+        cache.get(("item", 1))
+        cache.get(("item", 1))
+        cache.discard(("item", 1))
+        assert cache.get(("item", 1)) is None
+        assert (cache.stats.hits, cache.stats.misses) == (2, 2)
+        assert cache.stats.hit_rate == 0.5
@@ -1,8 +1,6 @@
-from glob import glob
-from config import ROOT_DIR
-
-
-# load fixtures
+# fixture plugins, listed statically instead of globbing fixtures/ on every start
 pytest_plugins = [
-    file.replace("/", ".").replace(".py", "") for file in glob("fixtures/**/*.py", recursive=True, root_dir=ROOT_DIR)
+    "fixtures.hn_clients",
+    "fixtures.hn_metrics",
+    "fixtures.hn_stub",
 ]